@@ -1,19 +1,51 @@
-from flask import Flask, jsonify, request, redirect
+import time
+
+# Measured from the first import so slow module-level work shows up in /health.
+_IMPORT_STARTED = time.perf_counter()
+
+from flask import (
+    Flask, jsonify, request, redirect, make_response, Response, g, has_request_context,
+    stream_with_context,
+)
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.security import generate_password_hash, check_password_hash
-from datetime import datetime
+from datetime import datetime, date, timedelta, timezone
 import os
 import uuid
 import json
-from werkzeug.utils import secure_filename
+import base64
+import re
+import atexit
 import io
+import gzip
+import csv
+import zipfile
+import mimetypes
+from werkzeug.utils import secure_filename
 from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
-from sqlalchemy import inspect, text
-import boto3
-from functools import lru_cache
-from flask_migrate import Migrate
+from sqlalchemy import (
+    inspect, text, and_, or_, func, select, literal, union_all, update, bindparam
+)
+import click
+from botocore.exceptions import ClientError
+import threading
+import sys
+import subprocess
+import statistics
+import heapq
+import math
+from contextlib import contextmanager
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+import pricing
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload, contains_eager
+from sqlalchemy.engine import Engine
+from sqlalchemy import event
 
 # -------------------------------------------------
 # App setup
@@ -29,7 +61,10 @@ WASABI_BUCKET = os.getenv("WASABI_BUCKET")
 WASABI_REGION = os.getenv("WASABI_REGION", "eu-central-1")
 _endpoint = os.getenv("WASABI_ENDPOINT")
 if _endpoint:
-    if _endpoint.startswith("http://"):
+    # Plain HTTP is only kept for a local S3 stand-in (MinIO, moto server).
+    if _endpoint.startswith(("http://localhost", "http://127.0.0.1")):
+        pass
+    elif _endpoint.startswith("http://"):
         _endpoint = "https://" + _endpoint[len("http://"):]
     elif not _endpoint.startswith("https://"):
         _endpoint = f"https://{_endpoint}"
@@ -46,18 +81,23 @@ def _require(*pairs):
 
 @lru_cache
 def get_s3():
+    # boto3 is slow to import; only processes that talk to S3 pay for it.
+    import boto3
+
     _require(
         ("WASABI_KEY or WASABI_ACCESS_KEY_ID", WASABI_KEY),
         ("WASABI_SECRET or WASABI_SECRET_ACCESS_KEY", WASABI_SECRET),
         ("WASABI_BUCKET", WASABI_BUCKET),
     )
-    return boto3.client(
+    client = boto3.client(
         "s3",
         endpoint_url=WASABI_ENDPOINT,
         aws_access_key_id=WASABI_KEY,
         aws_secret_access_key=WASABI_SECRET,
         region_name=WASABI_REGION,
     )
+    instrument_s3(client)
+    return client
 
 
 BUCKET = WASABI_BUCKET
@@ -85,18 +125,147 @@ def enforce_https_in_production():
         url = request.url.replace("http://", "https://", 1)
         return redirect(url, code=301)
 
+
+# Response encoding: JSON goes through orjson when it is installed
+# (JSON_PROVIDER=default keeps Flask's encoder), and text bodies of at least
+# COMPRESS_MIN_BYTES are brotli- or gzip-compressed for clients that accept it.
+JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson")
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "2048"))
+COMPRESS_MIMETYPES = {"application/json", "application/x-ndjson", "text/csv", "text/plain"}
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Output matches the default provider: sorted keys, and dates, decimals and
+    other extras still go through Flask's ``default`` hook.
+    """
+
+    def _options(self, sort_keys, indent):
+        import orjson
+
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def _encode(self, obj, sort_keys, indent):
+        import orjson
+
+        return orjson.dumps(obj, default=self.default, option=self._options(sort_keys, indent))
+
+    def dumps(self, obj, **kwargs):
+        if set(kwargs) - {"sort_keys", "indent", "separators"}:
+            return super().dumps(obj, **kwargs)
+        encoded = self._encode(obj, kwargs.get("sort_keys", self.sort_keys), kwargs.get("indent"))
+        return encoded.decode()
+
+    def loads(self, s, **kwargs):
+        import orjson
+
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._encode(obj, self.sort_keys, indent) + b"\n", mimetype=self.mimetype
+        )
+
+
+def make_json_provider(flask_app):
+    if JSON_PROVIDER == "orjson":
+        try:
+            import orjson  # noqa: F401
+        except ImportError:
+            flask_app.logger.info("orjson not installed; using the default JSON provider")
+        else:
+            return OrjsonProvider(flask_app)
+    return DefaultJSONProvider(flask_app)
+
+
+app.json = make_json_provider(app)
+
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def choose_encoding():
+    """Best response encoding the client accepts: br, gzip or None."""
+    accepted = request.accept_encodings
+    if accepted["br"] and _brotli() is not None:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def encode_body(body, encoding):
+    if encoding == "br":
+        return _brotli().compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, GZIP_LEVEL)
+
+
+def compress_response(response, encoded_cache=None):
+    """Compress ``response`` in place if worthwhile and accepted.
+
+    ``encoded_cache`` (encoding -> bytes) lets cached responses reuse bodies
+    compressed for earlier requests.
+    """
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESS_MIMETYPES
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    encoding = choose_encoding()
+    if len(body) < COMPRESS_MIN_BYTES or encoding is None:
+        return response
+    if encoded_cache is None:
+        encoded = encode_body(body, encoding)
+    else:
+        encoded = encoded_cache.get(encoding)
+        if encoded is None:
+            encoded = encoded_cache[encoding] = encode_body(body, encoding)
+    response.set_data(encoded)
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+app.after_request(compress_response)
+
 # -------------------------------------------------
 # Paths & DB config
 # -------------------------------------------------
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
-app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+# x_for: rate limits key on the client address the proxy saw, not the proxy's
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)
 
 
-def save_file(file_storage, prefix="designs") -> str:
-    filename = secure_filename(file_storage.filename or "upload")
+def new_object_key(prefix, filename) -> str:
+    filename = secure_filename(filename or "upload")
     ext = (filename.rsplit(".", 1)[-1] or "jpg").lower()
-    key = f"{prefix}/{uuid.uuid4().hex}.{ext}"
+    return f"{prefix}/{uuid.uuid4().hex}.{ext}"
+
+
+def save_file(file_storage, prefix="designs") -> str:
+    key = new_object_key(prefix, file_storage.filename)
     s3 = get_s3()
     s3.upload_fileobj(
         file_storage.stream,
@@ -108,6 +277,52 @@ def save_file(file_storage, prefix="designs") -> str:
     )
     return key
 
+
+# Direct-to-bucket uploads: the browser POSTs the file to a presigned form and
+# then calls the regular create endpoint with the object key, so web workers
+# never carry upload bytes.
+UPLOAD_URL_TTL = 900
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
+UPLOAD_CONTENT_TYPES = {"image/jpeg", "image/png", "image/webp"}
+UPLOAD_KEY_PATTERNS = {
+    "designs": re.compile(r"^designs/[0-9a-f]{32}\.[a-z0-9]+$"),
+    "custom_orders": re.compile(r"^custom_orders/([0-9a-f]{8})/[0-9a-f]{32}\.[a-z0-9]+$"),
+}
+
+
+def presign_upload(prefix, filename, content_type):
+    """Return a presigned POST for a new object under ``prefix``."""
+    key = new_object_key(prefix, filename)
+    post = get_s3().generate_presigned_post(
+        BUCKET,
+        key,
+        Fields={"Content-Type": content_type},
+        Conditions=[
+            {"Content-Type": content_type},
+            ["content-length-range", 1, MAX_UPLOAD_BYTES],
+        ],
+        ExpiresIn=UPLOAD_URL_TTL,
+    )
+    return {"key": key, "url": post["url"], "fields": post["fields"]}
+
+
+def verify_upload(key, kind):
+    """Check a direct upload landed where and how it was presigned.
+
+    Returns an error message, or ``None`` if the object is acceptable.
+    """
+    if not isinstance(key, str) or not UPLOAD_KEY_PATTERNS[kind].match(key):
+        return "Invalid upload key"
+    try:
+        head = get_s3().head_object(Bucket=BUCKET, Key=key)
+    except ClientError:
+        return "Upload not found"
+    if head.get("ContentLength", 0) > MAX_UPLOAD_BYTES:
+        return "Upload too large"
+    if head.get("ContentType") not in UPLOAD_CONTENT_TYPES:
+        return "Unsupported content type"
+    return None
+
 raw_url = os.environ.get("DATABASE_URL")
 if raw_url and raw_url.startswith("postgres://"):
     raw_url = raw_url.replace("postgres://", "postgresql://", 1)
@@ -117,7 +332,12 @@ app.config["SQLALCHEMY_DATABASE_URI"] = raw_url or f"sqlite:///{db_path}"
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
 db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+# Flask-Migrate (and Alembic) is only needed by the `flask db` commands, so
+# web workers skip importing it.
+if os.environ.get("FLASK_RUN_FROM_CLI") == "true":
+    from flask_migrate import Migrate
+
+    migrate = Migrate(app, db)
 
 # -------------------------------------------------
 # Models
@@ -162,6 +382,8 @@ MAIN_CATEGORIES = [
 
 
 class Category(db.Model):
+    __table_args__ = (db.Index("ix_category_main_category", "main_category"),)
+
     id = db.Column(db.Integer, primary_key=True)
     main_category = db.Column(db.String(100), nullable=False)
     name = db.Column(db.String(100), nullable=False)
@@ -169,6 +391,17 @@ class Category(db.Model):
 
 
 class Design(db.Model):
+    __table_args__ = (
+        # category listings, paged by id
+        db.Index("ix_design_category_id", "category_id", "id"),
+        # bestsellers and featured/hidden filters
+        db.Index("ix_design_featured_hidden", "featured", "hidden", "id"),
+        # title uniqueness checks
+        db.Index("ix_design_title", "title"),
+        # order-item linking and upload reuse checks
+        db.Index("ix_design_image_filename", "image_filename"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     category_id = db.Column(db.Integer, db.ForeignKey("category.id"), nullable=False)
     title = db.Column(db.String(100))
@@ -178,6 +411,8 @@ class Design(db.Model):
     thickness = db.Column(db.String(50))
     featured = db.Column(db.Boolean, default=False)
     hidden = db.Column(db.Boolean, default=False)
+    # Comma-separated names of the generated IMAGE_VARIANTS for image_filename
+    image_variants = db.Column(db.String(200))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     category = db.relationship("Category")
@@ -194,6 +429,10 @@ class ProductPerformance(db.Model):
 
 
 class CustomOrder(db.Model):
+    __table_args__ = (
+        db.Index("ix_custom_order_created_at", "created_at", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=True)
     order_code = db.Column(db.String(40), unique=True, nullable=False)
@@ -208,6 +447,13 @@ class CustomOrder(db.Model):
 
 
 class Order(db.Model):
+    __table_args__ = (
+        # admin listing, newest first
+        db.Index("ix_order_created_at", "created_at", "id"),
+        # customer order history
+        db.Index("ix_order_email_created_at", "email", "created_at", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     order_code = db.Column(db.String(20), unique=True, nullable=False)
     name = db.Column(db.String(100), nullable=False)
@@ -218,10 +464,42 @@ class Order(db.Model):
     postal_code = db.Column(db.String(20))
     payment_method = db.Column(db.String(50), default="cod")
     status = db.Column(db.String(20), default="pending")
-    items = db.Column(db.Text, nullable=False)
+    # Legacy JSON blob of line items; superseded by `order_item` and left as
+    # "[]" once an order's items have been moved there.
+    items = db.Column(db.Text, nullable=False, default="[]")
     total_price = db.Column(db.Float, nullable=False, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    line_items = db.relationship(
+        "OrderItem",
+        order_by="OrderItem.position",
+        cascade="all, delete-orphan",
+    )
+
+
+class OrderItem(db.Model):
+    __tablename__ = "order_item"
+
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(
+        db.Integer, db.ForeignKey("order.id"), nullable=False, index=True
+    )
+    position = db.Column(db.Integer, nullable=False, default=0)
+    design_id = db.Column(db.Integer, db.ForeignKey("design.id"), index=True)
+    # The design the item's sales are rolled up under. No foreign key, so it
+    # keeps its value when the design is deleted and design_id is cleared.
+    sales_design_id = db.Column(db.Integer)
+    custom_order_code = db.Column(db.String(40), index=True)
+    title = db.Column(db.String(100))
+    image = db.Column(db.String(200))
+    poster_type = db.Column(db.String(50))
+    size = db.Column(db.String(50))
+    thickness = db.Column(db.String(50))
+    price = db.Column(db.Float)
+    quantity = db.Column(db.Integer)
+    # Any other keys the client sent with the item, as JSON
+    extra = db.Column(db.Text)
+
 # New models for globally accessible discounts
 
 class PosterDiscount(db.Model):
@@ -239,6 +517,82 @@ class PromoCode(db.Model):
     amount = db.Column(db.Float, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+
+class DesignSearchTerm(db.Model):
+    """Inverted search index: one normalized token of a design's searchable text."""
+
+    __tablename__ = "design_search_term"
+    __table_args__ = (
+        db.Index("ix_design_search_term_term", "term", "design_id", "weight"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    design_id = db.Column(
+        db.Integer, db.ForeignKey("design.id"), nullable=False, index=True
+    )
+    term = db.Column(db.String(100), nullable=False)
+    weight = db.Column(db.Integer, nullable=False, default=1)
+
+
+class OrderCodeCounter(db.Model):
+    """Last order sequence number handed out for a two-digit year."""
+
+    __tablename__ = "order_code_counter"
+
+    year = db.Column(db.String(2), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class CacheGeneration(db.Model):
+    """Write counter per cached resource family, shared by all workers."""
+
+    __tablename__ = "cache_generation"
+
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class StorageJob(db.Model):
+    """Deferred object-storage work (deletes, copies); see ``StorageJobWorker``."""
+
+    __tablename__ = "storage_job"
+    __table_args__ = (db.Index("ix_storage_job_due", "status", "run_after", "id"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    action = db.Column(db.String(20), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(32))
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class SalesDaily(db.Model):
+    """Order count and revenue per creation day and current status."""
+
+    __tablename__ = "sales_daily"
+
+    day = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+
+
+class DesignSalesDaily(db.Model):
+    """Orders and units per design and day, excluding cancelled orders.
+
+    No foreign key to ``design`` so history survives design deletes.
+    """
+
+    __tablename__ = "design_sales_daily"
+
+    day = db.Column(db.Date, primary_key=True)
+    design_id = db.Column(db.Integer, primary_key=True)
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+
 # -------------------------------------------------
 # Admin seed
 # -------------------------------------------------
@@ -262,6 +616,13 @@ def init_db():
             with db.engine.begin() as conn:
                 conn.execute(text('ALTER TABLE "order" ADD COLUMN order_code VARCHAR(20)'))
 
+    # Patch old 'design' table if it exists and lacks columns
+    if "design" in inspector.get_table_names():
+        design_columns = [col["name"] for col in inspector.get_columns("design")]
+        if "image_variants" not in design_columns:
+            with db.engine.begin() as conn:
+                conn.execute(text("ALTER TABLE design ADD COLUMN image_variants VARCHAR(200)"))
+
     # Patch old 'user' table if it exists and lacks columns
     if "user" in inspector.get_table_names():
         user_columns = [col["name"] for col in inspector.get_columns("user")]
@@ -275,6 +636,42 @@ def init_db():
             with db.engine.begin() as conn:
                 conn.execute(text('ALTER TABLE "user" ADD COLUMN address VARCHAR(200)'))
 
+    # Patch old 'order_item' table: rollups key on sales_design_id
+    if "order_item" in inspector.get_table_names():
+        item_columns = [col["name"] for col in inspector.get_columns("order_item")]
+        if "sales_design_id" not in item_columns:
+            with db.engine.begin() as conn:
+                conn.execute(text("ALTER TABLE order_item ADD COLUMN sales_design_id INTEGER"))
+                conn.execute(text("UPDATE order_item SET sales_design_id = design_id"))
+
+    # Create indexes declared after their tables were first created
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+    # Move line items out of legacy Order.items blobs
+    backfill_order_items()
+
+    # Build the search index for catalogs created before it existed
+    if (
+        not db.session.query(DesignSearchTerm.id).first()
+        and db.session.query(Design.id).first()
+    ):
+        rebuild_search_index()
+        db.session.commit()
+
+    # Build sales rollups for order history recorded before they existed
+    if not db.session.query(SalesDaily.day).first() and db.session.query(Order.id).first():
+        rebuild_sales_rollups()
+        db.session.commit()
+
+    # Seed response-cache generation counters
+    existing = {g.name for g in CacheGeneration.query}
+    missing_families = [f for f in CACHE_FAMILIES if f not in existing]
+    if missing_families:
+        db.session.add_all(CacheGeneration(name=f, value=0) for f in missing_families)
+        db.session.commit()
+
     # Seed admin if credentials are provided
     if (
         ADMIN_EMAIL
@@ -289,43 +686,1533 @@ def init_db():
         db.session.add(admin)
         db.session.commit()
 
+
+SCHEMA_LOCK_KEY = 725_100_001
+
+
+@contextmanager
+def schema_lock():
+    """Serialize schema setup across hosts (Postgres) or processes (SQLite)."""
+    if db.engine.dialect.name == "postgresql":
+        with db.engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": SCHEMA_LOCK_KEY})
+                conn.commit()
+        return
+    import fcntl
+
+    with open(os.path.join(BASE_DIR, ".init_db.lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+@app.cli.command("init-db")
+def init_db_command():
+    """Create and patch tables and seed data; run once per deploy."""
+    with schema_lock():
+        init_db()
+    click.echo("Database initialized")
+
+
+@app.cli.command("startup-time")
+@click.option("--runs", default=5, show_default=True)
+def startup_time_command(runs):
+    """Time a cold `import app` in fresh interpreters."""
+    script = "import app; print(app.STARTUP_SECONDS)"
+    # Measure what a web worker pays, not the CLI-only imports
+    env = {k: v for k, v in os.environ.items() if k != "FLASK_RUN_FROM_CLI"}
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        samples.append(float(out.strip().splitlines()[-1]))
+    click.echo(
+        f"import app: median {statistics.median(samples):.3f}s "
+        f"min {min(samples):.3f}s max {max(samples):.3f}s ({runs} runs)"
+    )
+
 # -------------------------------------------------
 # Helpers
 # -------------------------------------------------
+def _last_order_seq(year_prefix):
+    """Highest sequence already used for ``year_prefix`` (one-off, per year)."""
+    codes = db.session.scalars(
+        select(Order.order_code).where(Order.order_code.like(f"{year_prefix}%"))
+    )
+    return max((int(c[2:]) for c in codes if c[2:].isdigit()), default=0)
+
+
 def generate_order_code():
-    """Generate a human-friendly order code like '250001'."""
+    """Generate a human-friendly order code like '250001'.
+
+    Sequences come from the per-year ``order_code_counter`` row. The counter is
+    incremented with a single UPDATE that row-locks it until the caller's
+    transaction commits, so concurrent checkouts never receive the same code
+    and a rolled-back order releases its number. Past 9999 the code simply
+    grows a digit ('2610000').
+    """
     year_prefix = datetime.utcnow().strftime("%y")
-    last = (
-        Order.query.filter(Order.order_code.like(f"{year_prefix}%"))
-        .order_by(Order.order_code.desc())
-        .first()
+    counter = OrderCodeCounter.__table__
+    for _ in range(2):
+        result = db.session.execute(
+            counter.update()
+            .where(counter.c.year == year_prefix)
+            .values(value=counter.c.value + 1)
+        )
+        if result.rowcount:
+            seq = db.session.execute(
+                select(counter.c.value).where(counter.c.year == year_prefix)
+            ).scalar_one()
+            return f"{year_prefix}{seq:04d}"
+        # First order of the year: start the counter after any existing codes.
+        try:
+            with db.session.begin_nested():
+                db.session.execute(
+                    counter.insert().values(
+                        year=year_prefix, value=_last_order_seq(year_prefix)
+                    )
+                )
+        except IntegrityError:
+            pass  # another worker created it first; retry the UPDATE
+    raise RuntimeError("Could not allocate an order code")
+
+
+def upsert_add(conn, table, keys, rows):
+    """Add the counter columns of ``rows`` to ``table``, inserting new keys.
+
+    ``rows`` are dicts with the same columns; those not named in ``keys`` are
+    counters. Uses one ON CONFLICT DO UPDATE on PostgreSQL and SQLite, and
+    otherwise updates the rows that exist and inserts the rest.
+    """
+    counters = [k for k in rows[0] if k not in keys]
+    dialect = conn.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(table).values(rows)
+        conn.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c[k] for k in keys],
+                set_={c: table.c[c] + stmt.excluded[c] for c in counters},
+            )
+        )
+        return
+
+    def key_of(row):
+        return tuple(row[k] for k in keys)
+
+    known = set(
+        conn.execute(
+            select(*(table.c[k] for k in keys)).where(
+                or_(*(and_(*(table.c[k] == r[k] for k in keys)) for r in rows))
+            )
+        ).all()
     )
-    if last:
-        seq = int(last.order_code[2:]) + 1
-    else:
-        seq = 1
-    return f"{year_prefix}{seq:04d}"
+    updates = [r for r in rows if key_of(r) in known]
+    if updates:
+        conn.execute(
+            table.update()
+            .where(*(table.c[k] == bindparam(f"b_{k}") for k in keys))
+            .values({c: table.c[c] + bindparam(f"b_{c}") for c in counters}),
+            [{f"b_{k}": v for k, v in r.items()} for r in updates],
+        )
+    inserts = [r for r in rows if key_of(r) not in known]
+    if inserts:
+        conn.execute(table.insert(), inserts)
+
+# Order line items: API item dicts map onto `order_item` columns; keys are
+# emitted in the same shape the storefront cart sends them.
+ORDER_ITEM_FIELDS = [
+    ("image", "image", str),
+    ("type", "poster_type", str),
+    ("size", "size", str),
+    ("thickness", "thickness", str),
+    ("price", "price", (int, float)),
+    ("quantity", "quantity", int),
+    ("orderCode", "custom_order_code", str),
+    ("title", "title", str),
+]
+ORDER_ITEM_LENGTHS = {
+    c.name: c.type.length
+    for c in OrderItem.__table__.columns
+    if getattr(c.type, "length", None)
+}
+
+
+def build_order_items(raw_items, strict=True):
+    """Turn API item dicts into unsaved ``OrderItem`` rows.
+
+    Designs are linked by an explicit ``designId`` or, failing that, by
+    matching the item's image key, using one query for the whole batch.
+    Explicit ids that name no design are dropped. Strings longer than their
+    column raise ``ValueError``, or are truncated when ``strict`` is false.
+    """
+    rows = []
+    explicit = []
+    for position, data in enumerate(raw_items):
+        data = dict(data)
+        row = OrderItem(position=position)
+        for key, column, kind in ORDER_ITEM_FIELDS:
+            value = data.get(key)
+            if not isinstance(value, kind) or isinstance(value, bool):
+                continue
+            limit = ORDER_ITEM_LENGTHS.get(column)
+            if limit and len(value) > limit:
+                if strict:
+                    raise ValueError(
+                        f"Item {position + 1}: {key} is longer than {limit} characters"
+                    )
+                value = value[:limit]
+            data.pop(key)
+            setattr(row, column, value)
+        row.extra = json.dumps(data) if data else None
+        design_id = data.get("designId")
+        if not isinstance(design_id, int) or isinstance(design_id, bool):
+            design_id = None
+        rows.append(row)
+        explicit.append(design_id)
+
+    ids = {i for i in explicit if i is not None}
+    images = {r.image for r in rows if r.image and not r.custom_order_code}
+    if not ids and not images:
+        return rows
+    known = db.session.execute(
+        select(Design.id, Design.image_filename).where(
+            or_(Design.id.in_(ids), Design.image_filename.in_(images))
+        )
+    ).all()
+    known_ids = {design_id for design_id, _ in known}
+    by_image = {image: design_id for design_id, image in known}
+    for row, design_id in zip(rows, explicit):
+        if design_id in known_ids:
+            row.design_id = design_id
+        elif not row.custom_order_code:
+            row.design_id = by_image.get(row.image)
+        row.sales_design_id = row.design_id
+    return rows
+
+
+def serialize_order_item(item, include_code=True):
+    data = {}
+    for key, column, _ in ORDER_ITEM_FIELDS:
+        value = getattr(item, column)
+        if value is not None and (include_code or key != "orderCode"):
+            data[key] = value
+    if item.extra:
+        data.update(app.json.loads(item.extra))
+    return data
+
+
+def backfill_order_items(batch_size=500):
+    """Move items from legacy ``Order.items`` blobs into ``order_item`` rows."""
+    while True:
+        batch = (
+            Order.query.filter(Order.items.isnot(None), Order.items.notin_(["", "[]"]))
+            .order_by(Order.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            return
+        for order in batch:
+            try:
+                raw_items = json.loads(order.items)
+            except ValueError:
+                raw_items = []
+            if not isinstance(raw_items, list):
+                raw_items = []
+            # Legacy blobs are already stored; keep what fits rather than fail
+            order.line_items = build_order_items(
+                (i for i in raw_items if isinstance(i, dict)), strict=False
+            )
+            order.items = "[]"
+        db.session.commit()
+
+
+# Design search: titles, category names and main categories are tokenized into
+# `design_search_term`. Queries match every token by prefix with an indexed
+# range scan and rank by the summed field weights of the matching terms.
+SEARCH_WEIGHTS = {"title": 3, "category": 2, "main_category": 1}
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(value):
+    return [t[:100] for t in _TOKEN_RE.findall((value or "").lower())]
+
+
+def search_terms_for(design, category=None):
+    """Return ``{term: weight}`` for a design, keeping each term's best field."""
+    if category is None and design.category_id is not None:
+        category = db.session.get(Category, int(design.category_id))
+    fields = [("title", design.title)]
+    if category:
+        fields += [("category", category.name), ("main_category", category.main_category)]
+    terms = {}
+    for field, value in fields:
+        for token in tokenize(value):
+            terms[token] = max(terms.get(token, 0), SEARCH_WEIGHTS[field])
+    return terms
+
+
+def index_design(design):
+    """Replace the search terms of ``design``; the caller commits."""
+    db.session.flush()
+    DesignSearchTerm.query.filter_by(design_id=design.id).delete(
+        synchronize_session=False
+    )
+    db.session.add_all(
+        DesignSearchTerm(design_id=design.id, term=term, weight=weight)
+        for term, weight in search_terms_for(design).items()
+    )
+
+
+def unindex_design(design_id):
+    DesignSearchTerm.query.filter_by(design_id=design_id).delete(
+        synchronize_session=False
+    )
+
+
+def reindex_category(category_id):
+    for design in Design.query.filter_by(category_id=category_id):
+        index_design(design)
+
+
+def rebuild_search_index():
+    """Re-create every search term from scratch; the caller commits."""
+    DesignSearchTerm.query.delete(synchronize_session=False)
+    categories = {c.id: c for c in Category.query}
+    for design in Design.query.yield_per(500):
+        db.session.add_all(
+            DesignSearchTerm(design_id=design.id, term=term, weight=weight)
+            for term, weight in search_terms_for(
+                design, categories.get(design.category_id)
+            ).items()
+        )
+
+
+def _prefix_upper_bound(prefix):
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def search_ranking(search):
+    """Return a subquery of ``(design_id, score)`` matching every search token.
+
+    Returns ``None`` if ``search`` has no indexable tokens.
+    """
+    tokens = list(dict.fromkeys(tokenize(search)))
+    if not tokens:
+        return None
+    matches = union_all(
+        *[
+            select(
+                DesignSearchTerm.design_id,
+                literal(i).label("token"),
+                DesignSearchTerm.weight,
+            ).where(
+                DesignSearchTerm.term >= token,
+                DesignSearchTerm.term < _prefix_upper_bound(token),
+            )
+            for i, token in enumerate(tokens)
+        ]
+    ).subquery()
+    # A design can match one token through several terms; count it once.
+    best = (
+        select(
+            matches.c.design_id,
+            matches.c.token,
+            func.max(matches.c.weight).label("weight"),
+        )
+        .group_by(matches.c.design_id, matches.c.token)
+        .subquery()
+    )
+    return (
+        select(best.c.design_id, func.sum(best.c.weight).label("score"))
+        .group_by(best.c.design_id)
+        .having(func.count(best.c.token) == len(tokens))
+        .subquery()
+    )
+
+
+@app.cli.command("reindex-search")
+def reindex_search_command():
+    """Rebuild the design search index."""
+    rebuild_search_index()
+    db.session.commit()
+    click.echo(f"Indexed {Design.query.count()} designs")
+
+
+# Sales analytics: orders are rolled up per day into `sales_daily` (by status)
+# and `design_sales_daily` (by design) in the same transaction that creates an
+# order or changes its status, so reports read a row per day rather than the
+# whole order history.
+ANALYTICS_PERIODS = ("day", "week", "month")
+ANALYTICS_DEFAULT_SPAN = {"day": 30, "week": 12, "month": 12}
+ANALYTICS_MAX_BUCKETS = 400
+ANALYTICS_TOP_DESIGNS = 5
+ANALYTICS_MAX_TOP = 50
+EXCLUDED_STATUS = "cancelled"
+
+
+def add_to_rollup(table, keys, rows):
+    """``upsert_add`` the non-zero ``rows`` into rollup ``table``.
+
+    Runs on the session's connection so it commits or rolls back with the
+    order change that caused it.
+    """
+    rows = [r for r in rows if any(v for k, v in r.items() if k not in keys)]
+    if rows:
+        upsert_add(db.session.connection(), table, keys, rows)
+
+
+def record_order_sales(order, status, sign=1, items=True):
+    """Add (``sign=1``) or remove (``-1``) ``order`` from the rollups.
+
+    ``status`` is the status bucket to adjust; design rows are only touched
+    when ``items`` is true and the status is not cancelled.
+    """
+    day = order.created_at.date()
+    revenue = sign * (order.total_price or 0)
+    add_to_rollup(
+        SalesDaily.__table__,
+        ("day", "status"),
+        [{"day": day, "status": status, "orders": sign, "revenue": revenue}],
+    )
+    if not items or status == EXCLUDED_STATUS:
+        return
+    per_design = {}
+    for item in order.line_items:
+        if item.sales_design_id is not None:
+            per_design[item.sales_design_id] = (
+                per_design.get(item.sales_design_id, 0) + (item.quantity or 1)
+            )
+    add_to_rollup(
+        DesignSalesDaily.__table__,
+        ("day", "design_id"),
+        [
+            {"day": day, "design_id": design_id, "orders": sign, "quantity": sign * quantity}
+            for design_id, quantity in sorted(per_design.items())
+        ],
+    )
+
+
+def change_order_status(order, status):
+    """Set ``order.status`` and move its rollup contributions along."""
+    old = order.status or "pending"
+    if old == status:
+        return
+    crosses = EXCLUDED_STATUS in (old, status)
+    record_order_sales(order, old, -1, items=crosses)
+    order.status = status
+    record_order_sales(order, status, 1, items=crosses)
+
+
+def rebuild_sales_rollups(batch_size=1000):
+    """Recompute both rollup tables from the orders; the caller commits."""
+    db.session.execute(SalesDaily.__table__.delete())
+    db.session.execute(DesignSalesDaily.__table__.delete())
+
+    sales = {}
+    rows = db.session.execute(
+        select(Order.created_at, Order.status, Order.total_price).execution_options(
+            yield_per=batch_size
+        )
+    )
+    for created_at, status, total in rows:
+        key = (created_at.date(), status or "pending")
+        orders, revenue = sales.get(key, (0, 0.0))
+        sales[key] = (orders + 1, revenue + (total or 0))
+
+    designs = {}
+    rows = db.session.execute(
+        select(Order.id, Order.created_at, OrderItem.sales_design_id, OrderItem.quantity)
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .where(OrderItem.sales_design_id.isnot(None))
+        .where(or_(Order.status.is_(None), Order.status != EXCLUDED_STATUS))
+        .order_by(Order.id, OrderItem.sales_design_id)
+        .execution_options(yield_per=batch_size)
+    )
+    last_order = None
+    for order_id, created_at, design_id, quantity in rows:
+        key = (created_at.date(), design_id)
+        orders, units = designs.get(key, (0, 0))
+        # One order counts once per design even with repeated line items
+        new_order = (order_id, design_id) != last_order
+        designs[key] = (orders + new_order, units + (quantity or 1))
+        last_order = (order_id, design_id)
+
+    if sales:
+        db.session.execute(
+            SalesDaily.__table__.insert(),
+            [
+                {"day": d, "status": st, "orders": n, "revenue": r}
+                for (d, st), (n, r) in sales.items()
+            ],
+        )
+    if designs:
+        db.session.execute(
+            DesignSalesDaily.__table__.insert(),
+            [
+                {"day": d, "design_id": i, "orders": n, "quantity": q}
+                for (d, i), (n, q) in designs.items()
+            ],
+        )
+
+
+def bucket_start(day, period):
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start, period):
+    if period == "week":
+        return start + timedelta(days=7)
+    if period == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def analytics_range(period, start, end):
+    """Bucket starts covering ``start``..``end`` (inclusive) for ``period``."""
+    buckets = []
+    current = bucket_start(start, period)
+    while current <= end:
+        buckets.append(current)
+        if len(buckets) > ANALYTICS_MAX_BUCKETS:
+            raise ValueError(f"Range too large: at most {ANALYTICS_MAX_BUCKETS} buckets")
+        current = next_bucket(current, period)
+    return buckets
+
+
+def sales_report(period, start, end, top=ANALYTICS_TOP_DESIGNS):
+    """Revenue, orders by status and top designs per bucket from the rollups.
+
+    Order counts include every status; revenue leaves out cancelled orders.
+    """
+    buckets = analytics_range(period, start, end)
+    first = buckets[0] if buckets else start
+    index = {b: i for i, b in enumerate(buckets)}
+
+    def empty():
+        return {"orders": 0, "revenue": 0.0, "by_status": {}, "designs": {}}
+
+    groups = [empty() for _ in buckets]
+    totals = empty()
+    for row in SalesDaily.query.filter(SalesDaily.day >= first, SalesDaily.day <= end):
+        if not row.orders:
+            continue
+        for group in (groups[index[bucket_start(row.day, period)]], totals):
+            status = group["by_status"].setdefault(row.status, {"orders": 0, "revenue": 0.0})
+            status["orders"] += row.orders
+            status["revenue"] += row.revenue
+            group["orders"] += row.orders
+            if row.status != EXCLUDED_STATUS:
+                group["revenue"] += row.revenue
+    for row in DesignSalesDaily.query.filter(
+        DesignSalesDaily.day >= first, DesignSalesDaily.day <= end
+    ):
+        for group in (groups[index[bucket_start(row.day, period)]], totals):
+            orders, quantity = group["designs"].get(row.design_id, (0, 0))
+            group["designs"][row.design_id] = (orders + row.orders, quantity + row.quantity)
+
+    def finish(group):
+        ranked = heapq.nlargest(
+            top, group.pop("designs").items(), key=lambda kv: (kv[1][1], kv[1][0], -kv[0])
+        )
+        group["top_designs"] = [
+            {"design_id": d, "orders": o, "quantity": q} for d, (o, q) in ranked if q > 0
+        ]
+        group["revenue"] = round(group["revenue"], 2)
+        for status in group["by_status"].values():
+            status["revenue"] = round(status["revenue"], 2)
+        return group
+
+    result = {
+        "period": period,
+        "start": first.isoformat(),
+        "end": end.isoformat(),
+        "buckets": [
+            dict(start=b.isoformat(), **finish(g)) for b, g in zip(buckets, groups)
+        ],
+        "totals": finish(totals),
+    }
+    ids = {
+        d["design_id"]
+        for group in [result["totals"], *result["buckets"]]
+        for d in group["top_designs"]
+    }
+    titles = {}
+    if ids:
+        titles = dict(
+            db.session.execute(select(Design.id, Design.title).where(Design.id.in_(ids))).all()
+        )
+    for group in [result["totals"], *result["buckets"]]:
+        for d in group["top_designs"]:
+            d["title"] = titles.get(d["design_id"])
+    return result
+
+
+@app.cli.command("rebuild-analytics")
+def rebuild_analytics_command():
+    """Recompute the daily sales rollups from the order history."""
+    rebuild_sales_rollups()
+    db.session.commit()
+    click.echo(f"Rolled up {SalesDaily.query.count()} day/status rows")
+
+
+# Product view counts are buffered per worker and written in one upsert per
+# flush: every VIEW_FLUSH_INTERVAL seconds, once VIEW_FLUSH_THRESHOLD views are
+# pending, before stats are read and when the worker exits.
+VIEW_FLUSH_INTERVAL = float(os.getenv("VIEW_FLUSH_INTERVAL", "5"))
+VIEW_FLUSH_THRESHOLD = int(os.getenv("VIEW_FLUSH_THRESHOLD", "500"))
+
+
+class ViewCountBuffer:
+    """In-process aggregation of ``ProductPerformance`` increments."""
+
+    def __init__(self, interval, threshold):
+        self.interval = interval
+        self.threshold = threshold
+        self._pending = {}
+        self._total = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread_pid = None
+
+    def add(self, design_id, n=1):
+        self._ensure_thread()
+        with self._lock:
+            self._pending[design_id] = self._pending.get(design_id, 0) + n
+            self._total += n
+            full = self._total >= self.threshold
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write all pending increments in one transaction."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending, self._total = self._pending, {}, 0
+            if not pending:
+                return
+            try:
+                with app.app_context():
+                    self._write(pending)
+            except Exception:
+                app.logger.exception("Failed to flush product view counts")
+                with self._lock:
+                    for design_id, n in pending.items():
+                        self._pending[design_id] = self._pending.get(design_id, 0) + n
+                        self._total += n
+
+    def _write(self, pending):
+        with db.engine.begin() as conn:
+            existing = conn.scalars(
+                select(Design.id).where(Design.id.in_(pending))
+            ).all()
+            rows = [{"design_id": d, "count": pending[d]} for d in existing]
+            if not rows:
+                return
+            upsert_add(conn, ProductPerformance.__table__, ["design_id"], rows)
+
+    def _ensure_thread(self):
+        # One flusher per process; forked workers start their own.
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+
+view_counts = ViewCountBuffer(VIEW_FLUSH_INTERVAL, VIEW_FLUSH_THRESHOLD)
+atexit.register(view_counts.flush)
+
+
+# Image derivatives: resized JPEG and WebP copies of each design image are
+# generated off the request path and stored next to the original, e.g.
+# designs/<uuid>.png -> designs/<uuid>@thumb.jpg. Pillow is only imported by
+# the worker jobs.
+IMAGE_VARIANTS = {
+    "thumb": (400, "JPEG"),
+    "medium": (1200, "JPEG"),
+    "thumb_webp": (400, "WEBP"),
+    "medium_webp": (1200, "WEBP"),
+}
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+IMAGE_QUEUE_SIZE = int(os.getenv("IMAGE_QUEUE_SIZE", "100"))
+
+
+def variant_key(key, variant):
+    _, image_format = IMAGE_VARIANTS[variant]
+    ext = "webp" if image_format == "WEBP" else "jpg"
+    return f"{key.rsplit('.', 1)[0]}@{variant}.{ext}"
+
+
+def design_variants(design):
+    return [v for v in (design.image_variants or "").split(",") if v]
+
+
+def generate_image_variants(design_id, key):
+    """Render and upload every variant of ``key``, then record them on the design."""
+    from PIL import Image
+
+    s3 = get_s3()
+    original = Image.open(io.BytesIO(s3.get_object(Bucket=BUCKET, Key=key)["Body"].read()))
+    original.load()
+    for variant, (width, image_format) in IMAGE_VARIANTS.items():
+        image = original.copy()
+        image.thumbnail((width, width * 2))
+        if image_format == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+        buf = io.BytesIO()
+        image.save(buf, image_format, quality=82)
+        buf.seek(0)
+        s3.put_object(
+            Bucket=BUCKET,
+            Key=variant_key(key, variant),
+            Body=buf,
+            ContentType=f"image/{image_format.lower()}",
+            CacheControl="public, max-age=31536000, immutable",
+        )
+
+    with app.app_context():
+        # Skip the update if the design's image was replaced meanwhile.
+        updated = Design.query.filter_by(id=design_id, image_filename=key).update(
+            {"image_variants": ",".join(IMAGE_VARIANTS)}, synchronize_session=False
+        )
+        if updated:
+            response_cache.bump("designs")
+        db.session.commit()
+
+
+class ImageJobQueue:
+    """Bounded thread pool for image-variant jobs.
+
+    Jobs that do not fit in the queue are dropped; the design keeps serving its
+    original image until ``flask backfill-image-variants`` picks it up.
+    """
+
+    def __init__(self, workers, size):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(size)
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def submit(self, design_id, key):
+        if not self._slots.acquire(blocking=False):
+            app.logger.warning("Image job queue full; skipping design %s", design_id)
+            return
+        try:
+            self._get_executor().submit(self._run, design_id, key)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _get_executor(self):
+        # Executors do not survive fork; each worker process builds its own.
+        with self._lock:
+            if self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="image-jobs"
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _run(self, design_id, key):
+        try:
+            generate_image_variants(design_id, key)
+        except Exception:
+            app.logger.exception("Image variants failed for design %s", design_id)
+        finally:
+            self._slots.release()
+
+
+image_jobs = ImageJobQueue(IMAGE_WORKERS, IMAGE_QUEUE_SIZE)
+
+
+@app.cli.command("backfill-image-variants")
+@click.option("--workers", default=4, show_default=True)
+@click.option("--all", "redo_all", is_flag=True, help="Regenerate existing variants too.")
+def backfill_image_variants_command(workers, redo_all):
+    """Generate image variants for designs that lack them."""
+    query = db.session.query(Design.id, Design.image_filename).filter(
+        Design.image_filename.isnot(None)
+    )
+    if not redo_all:
+        query = query.filter(or_(Design.image_variants.is_(None), Design.image_variants == ""))
+    jobs = query.all()
+    failed = 0
+    with ThreadPoolExecutor(workers) as pool:
+        futures = [pool.submit(generate_image_variants, d_id, key) for d_id, key in jobs]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as exc:
+                failed += 1
+                click.echo(f"error: {exc}", err=True)
+    click.echo(f"Processed {len(jobs) - failed} designs ({failed} failed)")
+
+
+# Keyset pagination: list endpoints switch to a paged envelope
+# ({"items": [...], "next_cursor": ...}) when `limit` or `cursor` is supplied.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, dict) or not values:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def page_args():
+    """Return ``(paginate, limit, cursor)`` parsed from the query string.
+
+    Raises ``ValueError`` for a malformed limit or cursor.
+    """
+    raw_limit = request.args.get("limit")
+    token = request.args.get("cursor")
+    if raw_limit is None and token is None:
+        return False, None, None
+    limit = DEFAULT_PAGE_SIZE
+    if raw_limit is not None:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise ValueError("Invalid limit")
+        if limit < 1:
+            raise ValueError("Invalid limit")
+        limit = min(limit, MAX_PAGE_SIZE)
+    cursor = decode_cursor(token) if token else None
+    return True, limit, cursor
+
+
+def fetch_page(query, limit):
+    """Fetch one page of ``query``; return ``(rows, has_more)``."""
+    rows = query.limit(limit + 1).all()
+    return rows[:limit], len(rows) > limit
+
+
+def created_before(model, cursor):
+    """Keyset filter for rows after ``cursor`` in (created_at, id) DESC order."""
+    try:
+        created_at = datetime.fromisoformat(cursor["created_at"])
+        last_id = int(cursor["id"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    return or_(
+        model.created_at < created_at,
+        and_(model.created_at == created_at, model.id < last_id),
+    )
+
+
+def created_cursor(row):
+    return encode_cursor({"created_at": row.created_at.isoformat(), "id": row.id})
+
+# Catalog response cache: every resource family has a generation counter in
+# `cache_generation` that write handlers bump inside their transaction. GET
+# responses are cached per (family, generation, URL) and carry the generation
+# as their ETag. Workers re-read the counters at most every
+# CACHE_GENERATION_REFRESH seconds, so other workers' writes show up within
+# that window and cache hits never touch the database.
+CACHE_FAMILIES = ("categories", "designs", "discounts")
+CACHE_GENERATION_REFRESH = float(os.getenv("CACHE_GENERATION_REFRESH", "2"))
+RESPONSE_CACHE_BYTES = int(os.getenv("RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+
+class CachedResponse:
+    """A serialized response plus the compressed bodies made from it so far."""
+
+    __slots__ = ("body", "mimetype", "encoded")
+
+    def __init__(self, body, mimetype):
+        self.body = body
+        self.mimetype = mimetype
+        self.encoded = {}
+
+    @property
+    def size(self):
+        return len(self.body) + sum(len(v) for v in self.encoded.values())
+
+
+class ResponseCache:
+    """LRU of serialized GET responses bounded by their total size in bytes."""
+
+    def __init__(self, maxbytes, refresh_interval):
+        self.maxbytes = maxbytes
+        self.refresh_interval = refresh_interval
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._generations = {}
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def generation(self, family):
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.refresh_interval:
+            rows = db.session.query(CacheGeneration.name, CacheGeneration.value).all()
+            with self._lock:
+                self._generations = dict(rows)
+                self._checked_at = now
+        return self._generations.get(family, 0)
+
+    def bump(self, *families):
+        """Invalidate ``families`` as part of the current transaction.
+
+        Upserts, so a database whose counters were never seeded by init-db
+        still invalidates.
+        """
+        upsert_add(
+            db.session.connection(),
+            CacheGeneration.__table__,
+            ["name"],
+            [{"name": family, "value": 1} for family in sorted(set(families))],
+        )
+        # Re-read the counters on the next request so this worker never
+        # serves its own stale entries.
+        self._checked_at = None
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        """Store ``entry``, or re-account it after it gained encoded bodies."""
+        size = entry.size
+        with self._lock:
+            self._bytes -= self._sizes.pop(key, 0)
+            self._entries.pop(key, None)
+            if size > self.maxbytes:
+                return
+            self._entries[key] = entry
+            self._sizes[key] = size
+            self._bytes += size
+            while self._bytes > self.maxbytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+            self._checked_at = None
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_BYTES, CACHE_GENERATION_REFRESH)
+
+
+def cached_get(family, args=()):
+    """Serve GET requests of a view from ``response_cache`` with ETag support.
+
+    ``args`` names the query arguments the view reads; only those go into
+    the cache key, so unrelated or junk parameters share one entry. The ETag
+    is weak because the same URL is served gzip, brotli or uncompressed.
+    Responses with embedded presigned URLs expire on their own and are never
+    cached.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*view_args, **kwargs):
+            if request.method != "GET" or wants_image_urls():
+                return view(*view_args, **kwargs)
+            generation = response_cache.generation(family)
+            etag = f"{family}-{generation}"
+            if request.if_none_match.contains_weak(etag):
+                response = app.response_class(status=304)
+            else:
+                query = tuple(request.args.get(name) for name in args)
+                key = (family, generation, request.path, query)
+                entry = response_cache.get(key)
+                encodings = None
+                if entry is None:
+                    response = make_response(view(*view_args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    entry = CachedResponse(response.get_data(), response.mimetype)
+                else:
+                    response = app.response_class(entry.body, mimetype=entry.mimetype)
+                    encodings = len(entry.encoded)
+                compress_response(response, entry.encoded)
+                # New entries, and hits that compressed a new encoding, change size
+                if encodings != len(entry.encoded):
+                    response_cache.put(key, entry)
+            response.set_etag(etag, weak=True)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+
+        return wrapper
+
+    return decorator
+
+# Checkout pricing: discounts and promo codes are indexed in memory per worker
+# and rebuilt whenever the "discounts" cache generation moves.
+_discount_index = {"generation": None, "index": None}
+_discount_index_lock = threading.Lock()
+
+
+def discount_index():
+    generation = response_cache.generation("discounts")
+    with _discount_index_lock:
+        if _discount_index["generation"] != generation or _discount_index["index"] is None:
+            _discount_index["index"] = pricing.DiscountIndex(
+                PosterDiscount.query.order_by(PosterDiscount.id).all(),
+                PromoCode.query.all(),
+            )
+            _discount_index["generation"] = generation
+        return _discount_index["index"]
+
+# Instrumentation: per-route latency histograms, SQL statement counts and time
+# per request (SQLAlchemy engine events) and S3 call timings (botocore event
+# hooks), exposed in Prometheus text format at /metrics. Metrics are kept per
+# worker process. Requests slower than SLOW_REQUEST_MS are logged with the
+# statements and S3 calls they made.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "0"))
+SLOW_REQUEST_MAX_EVENTS = 200
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250)
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_values=(), amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, total in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {total:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        for values, (counts, total, count) in items:
+            for bound, n in zip(self.buckets, counts):
+                labels = _format_labels(self.labels, values, [("le", f"{bound:g}")])
+                lines.append(f"{self.name}_bucket{labels} {n}")
+            labels = _format_labels(self.labels, values, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labels, values)
+            lines.append(f"{self.name}_sum{labels} {total:.6f}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "endpoint", "status")
+)
+http_latency = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "endpoint")
+)
+db_statements = Histogram(
+    "db_statements_per_request",
+    "SQL statements executed per HTTP request.",
+    ("endpoint",),
+    STATEMENT_BUCKETS,
+)
+db_seconds = Counter(
+    "db_statement_seconds_total", "Time spent in SQL statements during requests.", ("endpoint",)
+)
+s3_latency = Histogram("s3_call_duration_seconds", "S3 API call latency.", ("operation",))
+s3_errors = Counter("s3_call_errors_total", "S3 API calls that failed.", ("operation",))
+METRICS = (http_requests, http_latency, db_statements, db_seconds, s3_latency, s3_errors)
+
+
+class RequestTrace:
+    """SQL and S3 activity of the current request, kept on ``flask.g``."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.events = []
+        self.dropped = 0
+
+    def note(self, kind, seconds, detail):
+        if not SLOW_REQUEST_MS:
+            return
+        if len(self.events) >= SLOW_REQUEST_MAX_EVENTS:
+            self.dropped += 1
+            return
+        self.events.append((kind, seconds, detail))
+
+
+def current_trace():
+    return g.get("trace") if has_request_context() else None
+
+
+def request_endpoint():
+    return request.url_rule.rule if request.url_rule else "<unmatched>"
+
+
+# Start times are keyed by cursor so a failure can only discard its own entry
+def _statement_started(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("statement_started", {})[id(cursor)] = time.perf_counter()
+
+
+def _statement_finished(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("statement_started", {}).pop(id(cursor), None)
+    trace = current_trace()
+    if started is None or trace is None:
+        return
+    elapsed = time.perf_counter() - started
+    trace.statements += 1
+    trace.db_seconds += elapsed
+    trace.note("sql", elapsed, " ".join(statement.split())[:500])
+
+
+def _statement_failed(context):
+    # ExceptionContext.cursor is only set for errors raised around a cursor
+    cursor = getattr(context, "cursor", None)
+    if cursor is None and context.execution_context is not None:
+        cursor = context.execution_context.cursor
+    if context.connection is not None and cursor is not None:
+        context.connection.info.get("statement_started", {}).pop(id(cursor), None)
+
+
+if METRICS_ENABLED:
+    event.listen(Engine, "before_cursor_execute", _statement_started)
+    event.listen(Engine, "after_cursor_execute", _statement_finished)
+    event.listen(Engine, "handle_error", _statement_failed)
+
+
+def _s3_call_started(model, context, **kwargs):
+    context["metrics_call"] = (model.name, time.perf_counter())
+
+
+def _s3_call_finished(context, http_response=None, exception=None, **kwargs):
+    # after-call-error (connection failures) carries no model, hence the context
+    call = context.pop("metrics_call", None)
+    if call is None:
+        return
+    operation, started = call
+    elapsed = time.perf_counter() - started
+    s3_latency.observe((operation,), elapsed)
+    failed = exception is not None or (
+        http_response is not None and http_response.status_code >= 400
+    )
+    if failed:
+        s3_errors.inc((operation,))
+    trace = current_trace()
+    if trace is not None:
+        trace.note("s3", elapsed, operation + (" (failed)" if failed else ""))
+
+
+def instrument_s3(client):
+    if not METRICS_ENABLED:
+        return
+    client.meta.events.register("before-call.s3", _s3_call_started)
+    client.meta.events.register("after-call.s3", _s3_call_finished)
+    client.meta.events.register("after-call-error.s3", _s3_call_finished)
+
+
+@app.before_request
+def start_request_trace():
+    if METRICS_ENABLED:
+        g.trace = RequestTrace()
+
+
+def finish_request_trace(status):
+    trace = g.pop("trace", None)
+    if trace is None:
+        return
+    elapsed = time.perf_counter() - trace.started
+    endpoint = request_endpoint()
+    http_requests.inc((request.method, endpoint, str(status)))
+    http_latency.observe((request.method, endpoint), elapsed)
+    db_statements.observe((endpoint,), trace.statements)
+    db_seconds.inc((endpoint,), trace.db_seconds)
+    if SLOW_REQUEST_MS and elapsed * 1000 >= SLOW_REQUEST_MS:
+        lines = [
+            f"  {kind} {seconds * 1000:8.2f} ms  {detail}" for kind, seconds, detail in trace.events
+        ]
+        if trace.dropped:
+            lines.append(f"  ... {trace.dropped} more")
+        app.logger.warning(
+            "Slow request %s %s -> %s in %.1f ms (%d statements, %.1f ms in SQL)\n%s",
+            request.method,
+            request.full_path.rstrip("?"),
+            status,
+            elapsed * 1000,
+            trace.statements,
+            trace.db_seconds * 1000,
+            "\n".join(lines),
+        )
+
+
+@app.after_request
+def record_request_metrics(response):
+    finish_request_trace(response.status_code)
+    return response
+
+
+@app.teardown_request
+def record_failed_request_metrics(exc):
+    # Only still pending when the view raised and no response was made
+    if "trace" in g:
+        finish_request_trace(500)
+
+# Rate limiting: token buckets keyed by rule and client (IP or email). Each key
+# holds two numbers, and the local store evicts the least recently used keys
+# beyond RATE_LIMIT_MAX_KEYS. Set RATE_LIMIT_REDIS_URL to share buckets across
+# workers; rules are overridden with RATE_LIMIT_<RULE>="<n>/<period>".
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+RATE_LIMIT_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(spec):
+    """``"10/minute"`` -> (tokens per second, burst of 10)."""
+    count, _, period = spec.partition("/")
+    count = int(count)
+    if count < 1 or period not in RATE_LIMIT_PERIODS:
+        raise ValueError(f"Invalid rate limit: {spec!r}")
+    return count / RATE_LIMIT_PERIODS[period], count
+
+
+def _refill(tokens, updated_at, now, rate, burst):
+    return min(burst, tokens + max(0.0, now - updated_at) * rate)
+
+
+class LocalRateLimitStore:
+    """Per-process token buckets in a bounded LRU."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, cost=1):
+        """Spend ``cost`` tokens; return ``(allowed, seconds until allowed)``."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (burst, now))
+            tokens = _refill(tokens, updated_at, now, rate, burst)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+
+class RedisRateLimitStore:
+    """Token buckets shared by every worker through Redis.
+
+    Buckets expire once they would be full again. If Redis is unreachable
+    requests are let through rather than failing the site.
+    """
+
+    SCRIPT = """
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+    local now, cost = tonumber(ARGV[3]), tonumber(ARGV[4])
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    local allowed = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+        allowed = 1
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return {allowed, tostring(tokens)}
+    """
+
+    def __init__(self, client, prefix="ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(self.SCRIPT)
+
+    def take(self, key, rate, burst, cost=1):
+        try:
+            allowed, tokens = self._script(
+                keys=[self.prefix + key], args=[rate, burst, time.time(), cost]
+            )
+        except Exception:
+            app.logger.exception("Rate limit backend unavailable; allowing request")
+            return True, 0.0
+        if int(allowed):
+            return True, 0.0
+        return False, (cost - float(tokens)) / rate
+
+
+def make_rate_limit_store():
+    if RATE_LIMIT_REDIS_URL:
+        import redis
+
+        return RedisRateLimitStore(redis.Redis.from_url(RATE_LIMIT_REDIS_URL))
+    return LocalRateLimitStore(RATE_LIMIT_MAX_KEYS)
+
+
+rate_limit_store = make_rate_limit_store()
+
+
+def client_ip():
+    return request.remote_addr or "unknown"
+
+
+def json_email():
+    email = (request.get_json(silent=True) or {}).get("email")
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+def password_change_email():
+    """``json_email`` for requests that set a new password, else None."""
+    return json_email() if (request.get_json(silent=True) or {}).get("new_password") else None
+
+
+def rate_limit(rule, default, key=client_ip, methods=("POST",)):
+    """Reject requests over ``rule``'s rate with 429 and ``Retry-After``.
+
+    ``key`` names the client for the bucket; returning None skips the check.
+    Stack the decorator to apply several rules to one view.
+    """
+    rate, burst = parse_rate(os.getenv(f"RATE_LIMIT_{rule.upper()}", default))
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if RATE_LIMIT_ENABLED and request.method in methods:
+                client = key()
+                if client is not None:
+                    allowed, retry_after = rate_limit_store.take(f"{rule}:{client}", rate, burst)
+                    if not allowed:
+                        response = jsonify(error="Too many requests")
+                        response.status_code = 429
+                        response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+                        return response
+            return view(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
 
 # -------------------------------------------------
 # Routes
 # -------------------------------------------------
 @app.route("/health")
 def health():
-    return {"status": "ok"}, 200
+    return {"status": "ok", "startup_seconds": round(STARTUP_SECONDS, 3)}, 200
+
+
+@app.route("/metrics")
+def metrics():
+    if not METRICS_ENABLED:
+        return jsonify(error="Metrics are disabled"), 404
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        return jsonify(error="Unauthorized"), 401
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+
+# Presigned URLs are valid for an hour; reuse a signed URL until it is within
+# the refresh margin of expiring so the browser always gets usable links.
+IMAGE_URL_TTL = 3600
+IMAGE_URL_REFRESH_MARGIN = 300
+IMAGE_URL_CACHE_SIZE = int(os.getenv("IMAGE_URL_CACHE_SIZE", "4096"))
+MAX_IMAGE_BATCH = 200
+
+
+class SignedUrlCache:
+    """Bounded LRU cache of presigned GET URLs keyed by object key."""
+
+    def __init__(self, maxsize, ttl, margin):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.margin = margin
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """Return ``{key: url}`` for ``keys``, signing only missing/stale ones."""
+        now = time.monotonic()
+        urls = {}
+        stale = []
+        with self._lock:
+            # A listing can name the same key more than once; sign it once
+            for key in dict.fromkeys(keys):
+                entry = self._entries.get(key)
+                if entry and entry[1] - self.margin > now:
+                    self._entries.move_to_end(key)
+                    urls[key] = entry[0]
+                else:
+                    stale.append(key)
+
+        if stale:
+            s3 = get_s3()
+            signed = {}
+            for key in stale:
+                signed[key] = s3.generate_presigned_url(
+                    "get_object",
+                    Params={"Bucket": BUCKET, "Key": key},
+                    ExpiresIn=self.ttl,
+                )
+            expires = now + self.ttl
+            with self._lock:
+                for key, url in signed.items():
+                    self._entries[key] = (url, expires)
+                    self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            urls.update(signed)
+        return urls
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+image_urls = SignedUrlCache(IMAGE_URL_CACHE_SIZE, IMAGE_URL_TTL, IMAGE_URL_REFRESH_MARGIN)
 
 
 @app.route("/api/image/<path:key>")
 def get_image(key):
-    """Return a presigned URL for an object stored in Wasabi."""
-    s3 = get_s3()
-    url = s3.generate_presigned_url(
-        "get_object",
-        Params={"Bucket": BUCKET, "Key": key},
-        ExpiresIn=3600,
-    )
+    """Return a presigned URL for an object stored in Wasabi.
+
+    ``?variant=thumb`` (etc.) returns the URL of that derivative instead; use
+    it only for variants listed in the design's ``imageVariants``.
+    """
+    try:
+        variant = requested_variant()
+    except ValueError as exc:
+        return jsonify(error=str(exc)), 400
+    if variant:
+        key = variant_key(key, variant)
+    url = image_urls.get_many([key])[key]
     return jsonify({"url": url})
 
 
+@app.route("/api/uploads", methods=["POST"])
+@rate_limit("uploads", "30/minute")
+def create_upload():
+    """Presign a direct browser upload for a design or custom order file."""
+    data = request.get_json() or {}
+    kind = data.get("kind")
+    content_type = data.get("content_type")
+    if kind not in UPLOAD_KEY_PATTERNS:
+        return jsonify(error="kind must be 'designs' or 'custom_orders'"), 400
+    if content_type not in UPLOAD_CONTENT_TYPES:
+        return jsonify(error="Unsupported content type"), 400
+
+    if kind == "custom_orders":
+        order_code = uuid.uuid4().hex[:8]
+        upload = presign_upload(
+            f"custom_orders/{order_code}", data.get("filename"), content_type
+        )
+        upload["order_code"] = order_code
+    else:
+        upload = presign_upload("designs", data.get("filename"), content_type)
+    upload["expires_in"] = UPLOAD_URL_TTL
+    upload["max_bytes"] = MAX_UPLOAD_BYTES
+    return jsonify(upload), 201
+
+
+@app.route("/api/images", methods=["POST"])
+def get_images():
+    """Return presigned URLs for many object keys in one response."""
+    data = request.get_json() or {}
+    keys = data.get("keys")
+    if not isinstance(keys, list) or not all(isinstance(k, str) and k for k in keys):
+        return jsonify(error="keys must be a list of object keys"), 400
+    if len(keys) > MAX_IMAGE_BATCH:
+        return jsonify(error=f"At most {MAX_IMAGE_BATCH} keys per request"), 400
+    return jsonify({"urls": image_urls.get_many(keys)})
+
+
 def serialize_design(design):
     return {
         "id": design.id,
@@ -337,6 +2224,59 @@ def serialize_design(design):
         "thickness": design.thickness,
         "featured": design.featured,
         "hidden": design.hidden,
+        "imageVariants": design_variants(design),
+    }
+
+
+def serialize_designs(designs, with_urls=False, variant=None):
+    """Serialize a list of designs, optionally embedding presigned image URLs.
+
+    URLs are resolved in one batch through ``image_urls`` so a listing costs at
+    most one signing pass instead of one ``/api/image`` request per design.
+    With ``variant``, designs that have that derivative link to it instead of
+    the original.
+    """
+    payload = [serialize_design(d) for d in designs]
+    if with_urls:
+        for d in payload:
+            key = d["imageKey"]
+            if key and variant in d["imageVariants"]:
+                key = variant_key(key, variant)
+            d["_urlKey"] = key
+        keys = [d["_urlKey"] for d in payload if d["_urlKey"]]
+        urls = image_urls.get_many(keys) if keys else {}
+        for d in payload:
+            d["imageUrl"] = urls.get(d.pop("_urlKey"))
+    return payload
+
+
+def wants_image_urls():
+    return request.args.get("with_urls", "").lower() in ("1", "true")
+
+
+def requested_variant():
+    """Return the ``variant`` query arg; raises ``ValueError`` if unknown."""
+    variant = request.args.get("variant")
+    if variant and variant not in IMAGE_VARIANTS:
+        raise ValueError(f"Unknown variant: {variant}")
+    return variant
+
+
+def serialize_order(order, include_codes=True):
+    return {
+        "id": order.id,
+        "order_code": order.order_code,
+        "name": order.name,
+        "email": order.email,
+        "phone": order.phone,
+        "address": order.address,
+        "city": order.city,
+        "postal_code": order.postal_code,
+        "payment_method": order.payment_method,
+        "status": order.status,
+        "items": [serialize_order_item(i, include_codes) for i in order.line_items],
+        "total_price": order.total_price,
+        "created_at": order.created_at.isoformat(),
     }
 
 
@@ -360,6 +2300,7 @@ def serialize_promo_code(code):
 
 
 @app.route("/api/register", methods=["POST"])
+@rate_limit("register", "5/minute")
 def register():
     data = request.get_json() or {}
     email = data.get("email")
@@ -383,6 +2324,8 @@ def register():
 
 
 @app.route("/api/login", methods=["POST"])
+@rate_limit("login", "20/minute")
+@rate_limit("login_email", "5/minute", key=json_email)
 def login():
     data = request.get_json() or {}
     email = data.get("email")
@@ -402,6 +2345,8 @@ def login():
 
 
 @app.route("/api/user", methods=["GET", "PATCH"])
+@rate_limit("account", "20/minute", methods=("PATCH",))
+@rate_limit("password_email", "5/minute", key=password_change_email, methods=("PATCH",))
 def user_account():
     if request.method == "GET":
         email = request.args.get("email")
@@ -448,6 +2393,7 @@ def user_account():
 
 
 @app.route("/api/categories", methods=["GET", "POST"])
+@cached_get("categories")
 def categories():
     if request.method == "POST":
         data = request.get_json() or {}
@@ -462,6 +2408,7 @@ def categories():
             return jsonify(error=f"Missing or invalid fields: {', '.join(missing)}"), 400
         category = Category(name=name, main_category=main_category)
         db.session.add(category)
+        response_cache.bump("categories", "designs")
         db.session.commit()
         return (
             jsonify(
@@ -496,6 +2443,8 @@ def category_detail(cat_id):
             category.main_category = data["main_category"]
         if "name" in data:
             category.name = data["name"]
+        reindex_category(category.id)
+        response_cache.bump("categories", "designs")
         db.session.commit()
         return jsonify(
             id=category.id,
@@ -504,27 +2453,122 @@ def category_detail(cat_id):
         )
 
     db.session.delete(category)
+    response_cache.bump("categories", "designs")
     db.session.commit()
     return jsonify(message="Deleted")
 
 
+CATEGORY_TREE_MAX_FEATURED = 20
+
+
+def visible_design():
+    return or_(Design.hidden.is_(False), Design.hidden.is_(None))
+
+
+@app.route("/api/categories/tree")
+@cached_get("designs", args=("featured", "variant"))
+def category_tree():
+    """Main categories with their categories and visible-design counts.
+
+    Counts come from one grouped query. ``?featured=N`` adds up to N featured
+    designs (newest first) to every node, fetched in one windowed query.
+    Category writes bump the "designs" generation too, so one family covers
+    both.
+    """
+    try:
+        featured = int(request.args.get("featured", 0))
+        if not 0 <= featured <= CATEGORY_TREE_MAX_FEATURED:
+            raise ValueError(f"featured must be 0-{CATEGORY_TREE_MAX_FEATURED}")
+        variant = requested_variant()
+    except ValueError as exc:
+        return jsonify(error=str(exc)), 400
+
+    rows = db.session.execute(
+        select(Category.id, Category.name, Category.main_category, func.count(Design.id))
+        .outerjoin(Design, and_(Design.category_id == Category.id, visible_design()))
+        .group_by(Category.id, Category.name, Category.main_category)
+        .order_by(Category.name, Category.id)
+    ).all()
+
+    top = {}
+    if featured and rows:
+        rank = (
+            func.row_number()
+            .over(partition_by=Design.category_id, order_by=Design.id.desc())
+            .label("rank")
+        )
+        ranked = (
+            select(Design.id, rank)
+            .where(Design.featured.is_(True), visible_design())
+            .subquery()
+        )
+        picked = (
+            Design.query.join(ranked, ranked.c.id == Design.id)
+            .filter(ranked.c.rank <= featured)
+            .order_by(Design.id.desc())
+            .all()
+        )
+        serialized = serialize_designs(picked, wants_image_urls(), variant)
+        for design in serialized:
+            top.setdefault(design["categoryId"], []).append(design)
+
+    nodes = {name: [] for name in MAIN_CATEGORIES}
+    for cat_id, name, main_category, count in rows:
+        node = {"id": cat_id, "name": name, "design_count": count}
+        if featured:
+            node["featured"] = top.get(cat_id, [])
+        nodes.setdefault(main_category, []).append(node)
+
+    tree = []
+    for main_category, children in nodes.items():
+        node = {
+            "name": main_category,
+            "design_count": sum(c["design_count"] for c in children),
+            "categories": children,
+        }
+        if featured:
+            # Children hold their own newest N, so the parent's newest N are among them
+            merged = [d for c in children for d in c["featured"]]
+            node["featured"] = sorted(merged, key=lambda d: d["id"], reverse=True)[:featured]
+        tree.append(node)
+    return jsonify(tree)
+
+
+# Query arguments GET /api/designs reads; the response cache keys on these
+DESIGN_LIST_ARGS = (
+    "limit",
+    "cursor",
+    "variant",
+    "category_id",
+    "main_category",
+    "featured",
+    "hidden",
+    "search",
+)
+
+
 @app.route("/api/designs", methods=["GET", "POST"])
+@cached_get("designs", args=DESIGN_LIST_ARGS)
 def designs():
     if request.method == "POST":
-        form = request.form
+        # Either a multipart upload, or JSON/form fields naming an object
+        # already uploaded through /api/uploads as `image_key`.
+        form = request.get_json() if request.is_json else request.form
+        form = form or {}
         image = request.files.get("image")
+        image_key = form.get("image_key")
         category_id = form.get("category_id")
         title = form.get("title")
         poster_type = form.get("poster_type")
         size = form.get("size")
         thickness = form.get("thickness")
-        featured = form.get("featured", "false").lower() == "true"
-        hidden = form.get("hidden", "false").lower() == "true"
+        featured = str(form.get("featured", "false")).lower() == "true"
+        hidden = str(form.get("hidden", "false")).lower() == "true"
 
         missing = []
         if not category_id:
             missing.append("category_id")
-        if not image:
+        if not image and not image_key:
             missing.append("image")
         if missing:
             return jsonify(error=f"Missing fields: {', '.join(missing)}"), 400
@@ -532,7 +2576,15 @@ def designs():
         if title and Design.query.filter_by(title=title).first():
             return jsonify(error="Title already exists"), 400
 
-        key = save_file(image)
+        if image:
+            key = save_file(image)
+        else:
+            error = verify_upload(image_key, "designs")
+            if not error and Design.query.filter_by(image_filename=image_key).first():
+                error = "Upload already used"
+            if error:
+                return jsonify(error=error), 400
+            key = image_key
 
         design = Design(
             category_id=int(category_id),
@@ -545,9 +2597,18 @@ def designs():
             hidden=hidden,
         )
         db.session.add(design)
+        index_design(design)
+        response_cache.bump("designs")
         db.session.commit()
+        image_jobs.submit(design.id, key)
         return jsonify(serialize_design(design)), 201
 
+    try:
+        paginate, limit, cursor = page_args()
+        variant = requested_variant()
+    except ValueError as exc:
+        return jsonify(error=str(exc)), 400
+
     query = Design.query
     category_id = request.args.get("category_id")
     if category_id:
@@ -562,16 +2623,579 @@ def designs():
     if hidden is not None:
         query = query.filter_by(hidden=hidden.lower() == "true")
     search = request.args.get("search")
-    if search:
+    ranking = search_ranking(search) if search else None
+    if ranking is not None:
+        query = query.join(ranking, ranking.c.design_id == Design.id).order_by(
+            ranking.c.score.desc(), Design.id
+        )
+    elif search:
         query = query.filter(Design.title.ilike(f"%{search}%"))
 
-    designs_list = query.all()
-    if search and not designs_list:
+    if not paginate:
+        designs_list = query.all()
+        if search and not designs_list:
+            return jsonify(error="No item found with that name"), 404
+        return jsonify(
+            serialize_designs(designs_list, wants_image_urls(), variant)
+        )
+
+    if ranking is None:
+        query = query.order_by(Design.id)
+    if cursor:
+        try:
+            last_id = int(cursor["id"])
+            if ranking is not None:
+                score = int(cursor["score"])
+                query = query.filter(
+                    or_(
+                        ranking.c.score < score,
+                        and_(ranking.c.score == score, Design.id > last_id),
+                    )
+                )
+            else:
+                query = query.filter(Design.id > last_id)
+        except (KeyError, TypeError, ValueError):
+            return jsonify(error="Invalid cursor"), 400
+    if ranking is not None:
+        rows, has_more = fetch_page(query.add_columns(ranking.c.score), limit)
+        designs_list = [d for d, _ in rows]
+        next_cursor = (
+            encode_cursor({"score": int(rows[-1][1]), "id": rows[-1][0].id})
+            if has_more
+            else None
+        )
+    else:
+        designs_list, has_more = fetch_page(query, limit)
+        next_cursor = encode_cursor({"id": designs_list[-1].id}) if has_more else None
+    if search and not designs_list and not cursor:
         return jsonify(error="No item found with that name"), 404
-    return jsonify([serialize_design(d) for d in designs_list])
+    return jsonify(
+        items=serialize_designs(designs_list, wants_image_urls(), variant),
+        next_cursor=next_cursor,
+    )
+
+
+# Deleting designs: rows go in set-based statements and their images are
+# queued as storage jobs in the same transaction, to be removed with batched
+# delete_objects calls off the request path.
+S3_DELETE_BATCH = 1000
+DESIGN_DELETE_BATCH = 500
+
+
+def design_object_keys(image_filename, image_variants):
+    if not image_filename:
+        return []
+    return [image_filename] + [
+        variant_key(image_filename, v)
+        for v in (image_variants or "").split(",")
+        if v in IMAGE_VARIANTS
+    ]
+
+
+def purge_designs(design_ids):
+    """Delete designs and their dependent rows; the caller commits."""
+    for start in range(0, len(design_ids), DESIGN_DELETE_BATCH):
+        chunk = design_ids[start:start + DESIGN_DELETE_BATCH]
+        ProductPerformance.query.filter(ProductPerformance.design_id.in_(chunk)).delete(
+            synchronize_session=False
+        )
+        DesignSearchTerm.query.filter(DesignSearchTerm.design_id.in_(chunk)).delete(
+            synchronize_session=False
+        )
+        OrderItem.query.filter(OrderItem.design_id.in_(chunk)).update(
+            {"design_id": None}, synchronize_session=False
+        )
+        Design.query.filter(Design.id.in_(chunk)).delete(synchronize_session=False)
+    if design_ids:
+        response_cache.bump("designs")
+
+
+def delete_s3_objects(keys):
+    """Delete ``keys`` from the bucket; return ``[{"key", "error"}]`` failures."""
+    failed = []
+    for start in range(0, len(keys), S3_DELETE_BATCH):
+        chunk = keys[start:start + S3_DELETE_BATCH]
+        try:
+            response = get_s3().delete_objects(
+                Bucket=BUCKET,
+                Delete={"Objects": [{"Key": k} for k in chunk], "Quiet": True},
+            )
+        except Exception as exc:
+            failed += [{"key": k, "error": str(exc)} for k in chunk]
+            continue
+        failed += [
+            {"key": e.get("Key"), "error": e.get("Code") or e.get("Message")}
+            for e in response.get("Errors", [])
+        ]
+    return failed
+
+
+# Deferred storage work: S3 deletes and copies are recorded as `storage_job`
+# rows in the same transaction as the change that needs them and carried out
+# by a background thread in each worker process. Jobs are claimed with a
+# lease, so a worker that dies mid-job only delays it, and failures are
+# retried with exponential backoff until STORAGE_JOB_MAX_ATTEMPTS.
+STORAGE_JOB_WORKER = os.getenv("STORAGE_JOB_WORKER", "1") == "1"
+STORAGE_JOB_POLL = float(os.getenv("STORAGE_JOB_POLL", "5"))
+STORAGE_JOB_BATCH = int(os.getenv("STORAGE_JOB_BATCH", "50"))
+STORAGE_JOB_MAX_ATTEMPTS = int(os.getenv("STORAGE_JOB_MAX_ATTEMPTS", "8"))
+STORAGE_JOB_BACKOFF = 30
+STORAGE_JOB_MAX_BACKOFF = 6 * 3600
+STORAGE_JOB_LEASE = 300
+
+
+def enqueue_storage_job(action, **payload):
+    """Add a job to the current transaction; the caller commits."""
+    db.session.add(StorageJob(action=action, payload=json.dumps(payload)))
+
+
+def enqueue_object_deletes(keys):
+    keys = [k for k in dict.fromkeys(keys) if k]
+    for start in range(0, len(keys), S3_DELETE_BATCH):
+        enqueue_storage_job("delete", keys=keys[start:start + S3_DELETE_BATCH])
+    return len(keys)
+
+
+def claim_storage_jobs(limit):
+    """Lease up to ``limit`` due jobs to this caller and return them."""
+    now = datetime.utcnow()
+    token = uuid.uuid4().hex
+    due = (
+        select(StorageJob.id)
+        .where(StorageJob.status == "pending", StorageJob.run_after <= now)
+        .order_by(StorageJob.run_after, StorageJob.id)
+        .limit(limit)
+    )
+    ids = db.session.scalars(due).all()
+    if not ids:
+        return []
+    # Re-checking run_after makes concurrent claimers skip rows already taken
+    db.session.execute(
+        update(StorageJob)
+        .where(StorageJob.id.in_(ids), StorageJob.run_after <= now)
+        .values(
+            locked_by=token,
+            attempts=StorageJob.attempts + 1,
+            run_after=now + timedelta(seconds=STORAGE_JOB_LEASE),
+        )
+    )
+    db.session.commit()
+    return StorageJob.query.filter_by(locked_by=token).order_by(StorageJob.id).all()
+
+
+def run_storage_jobs(jobs):
+    """Carry out claimed ``jobs``; return ``(errors, remaining)``.
+
+    ``errors`` maps the id of each failed job to its error message and
+    ``remaining`` maps a failed delete job's id to the keys it still has to
+    delete.
+
+    Keys from every delete job are sent together in batches of
+    S3_DELETE_BATCH; a delete job that lost some keys keeps just those.
+    """
+    errors = {}
+    remaining = {}
+    owners = {}
+    for job in jobs:
+        payload = json.loads(job.payload)
+        if job.action == "delete":
+            for key in payload.get("keys", []):
+                owners.setdefault(key, []).append(job.id)
+        elif job.action == "copy":
+            try:
+                get_s3().copy_object(
+                    Bucket=BUCKET,
+                    Key=payload["dest"],
+                    CopySource={"Bucket": BUCKET, "Key": payload["source"]},
+                )
+            except Exception as exc:
+                errors[job.id] = str(exc)
+        else:
+            errors[job.id] = f"Unknown action: {job.action}"
+    for failure in delete_s3_objects(list(owners)):
+        for job_id in owners.get(failure["key"], []):
+            remaining.setdefault(job_id, []).append(failure["key"])
+            errors[job_id] = f"{failure['key']}: {failure['error']}"
+    return errors, remaining
+
+
+def finish_storage_jobs(jobs, errors, remaining):
+    """Delete finished jobs and reschedule or give up on failed ones."""
+    now = datetime.utcnow()
+    for job in jobs:
+        if job.id not in errors:
+            db.session.delete(job)
+            continue
+        job.locked_by = None
+        job.last_error = errors[job.id][:2000]
+        if job.id in remaining:
+            job.payload = json.dumps({"keys": remaining[job.id]})
+        if job.attempts >= STORAGE_JOB_MAX_ATTEMPTS:
+            job.status = "failed"
+            app.logger.error("Storage job %s failed for good: %s", job.id, job.last_error)
+        else:
+            backoff = min(STORAGE_JOB_BACKOFF * 2 ** (job.attempts - 1), STORAGE_JOB_MAX_BACKOFF)
+            job.run_after = now + timedelta(seconds=backoff)
+    db.session.commit()
+
+
+def drain_storage_jobs(batch_size=STORAGE_JOB_BATCH):
+    """Run due jobs batch by batch until none are left; return how many ran."""
+    total = 0
+    while True:
+        jobs = claim_storage_jobs(batch_size)
+        if not jobs:
+            return total
+        errors, remaining = run_storage_jobs(jobs)
+        finish_storage_jobs(jobs, errors, remaining)
+        total += len(jobs)
+
+
+class StorageJobWorker:
+    """Background thread that drains ``storage_job`` in each worker process."""
+
+    def __init__(self, poll_interval):
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread_pid = None
+
+    def ensure_started(self):
+        # Threads do not survive fork; each worker process starts its own.
+        if not STORAGE_JOB_WORKER or self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+        threading.Thread(target=self._run, name="storage-jobs", daemon=True).start()
+
+    def wake(self):
+        """Drain now instead of at the next poll; call after committing jobs."""
+        self.ensure_started()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            try:
+                with app.app_context():
+                    drain_storage_jobs()
+            except Exception:
+                app.logger.exception("Storage job worker failed")
+
+
+storage_jobs = StorageJobWorker(STORAGE_JOB_POLL)
+
+
+@app.before_request
+def start_storage_job_worker():
+    storage_jobs.ensure_started()
+
+
+@app.cli.command("run-storage-jobs")
+@click.option("--retry-failed", is_flag=True, help="Requeue jobs that ran out of attempts.")
+def run_storage_jobs_command(retry_failed):
+    """Run every due storage job now."""
+    if retry_failed:
+        requeued = StorageJob.query.filter_by(status="failed").update(
+            {"status": "pending", "attempts": 0, "run_after": datetime.utcnow()},
+            synchronize_session=False,
+        )
+        db.session.commit()
+        click.echo(f"Requeued {requeued} failed jobs")
+    click.echo(f"Ran {drain_storage_jobs()} storage jobs")
+    failed = StorageJob.query.filter_by(status="failed").count()
+    pending = StorageJob.query.filter_by(status="pending").count()
+    click.echo(f"{pending} pending, {failed} failed")
+
+
+# Object GC: reconciles the bucket with the database. Listings are streamed
+# page by page against the keys the database still references, so memory grows
+# with the number of designs and orders, never with the size of the bucket.
+GC_PREFIXES = ("designs/", "custom_orders/")
+GC_GRACE_HOURS = 48
+_VARIANT_KEY_RE = re.compile(r"^(designs/[^/@]+)@(\w+)\.[a-z0-9]+$")
+
+
+def referenced_object_keys(prefix):
+    """Keys under ``prefix`` used by designs, custom orders or past order items.
+
+    Also returns the stems of design images, which keep their
+    ``<stem>@<variant>.<ext>`` derivatives alive.
+    """
+    keys = set()
+    for column in (Design.image_filename, CustomOrder.file_path, OrderItem.image):
+        rows = db.session.execute(
+            select(column)
+            .where(column.startswith(prefix, autoescape=True))
+            .distinct()
+            .execution_options(yield_per=5000)
+        )
+        keys.update(key for (key,) in rows)
+    stems = {
+        key.rsplit(".", 1)[0]
+        for (key,) in db.session.execute(
+            select(Design.image_filename)
+            .where(Design.image_filename.startswith(prefix, autoescape=True))
+            .execution_options(yield_per=5000)
+        )
+    }
+    return keys, stems
+
+
+def is_referenced(key, keys, stems):
+    if key in keys:
+        return True
+    match = _VARIANT_KEY_RE.match(key)
+    return bool(match and match.group(2) in IMAGE_VARIANTS and match.group(1) in stems)
+
+
+def collect_orphans(prefix, grace, dry_run=False, force=False, report=click.echo):
+    """Delete (or with ``dry_run`` just report) unreferenced objects older than
+    ``grace`` under ``prefix``; return a stats dict.
+
+    Per-key lines go to ``report``, which takes ``click.echo``'s arguments;
+    failures are reported with ``err=True``.
+    """
+    keys, stems = referenced_object_keys(prefix)
+    if not keys and not force:
+        raise click.ClickException(
+            f"No database rows reference {prefix}; refusing to collect without --force"
+        )
+    cutoff = datetime.now(timezone.utc) - grace
+    stats = {"scanned": 0, "referenced": 0, "recent": 0, "orphaned": 0, "bytes": 0, "failed": 0}
+    pending = []
+
+    def flush():
+        if not dry_run and pending:
+            for failure in delete_s3_objects(pending):
+                stats["failed"] += 1
+                report(f"failed {failure['key']}: {failure['error']}", err=True)
+        pending.clear()
+
+    pages = get_s3().get_paginator("list_objects_v2").paginate(
+        Bucket=BUCKET, Prefix=prefix, PaginationConfig={"PageSize": S3_DELETE_BATCH}
+    )
+    for page in pages:
+        for obj in page.get("Contents", []):
+            stats["scanned"] += 1
+            if is_referenced(obj["Key"], keys, stems):
+                stats["referenced"] += 1
+            elif obj["LastModified"] > cutoff:
+                stats["recent"] += 1
+            else:
+                stats["orphaned"] += 1
+                stats["bytes"] += obj.get("Size", 0)
+                if dry_run:
+                    report(f"would delete {obj['Key']}")
+                pending.append(obj["Key"])
+                if len(pending) >= S3_DELETE_BATCH:
+                    flush()
+    flush()
+    return stats
+
+
+@app.cli.command("gc-objects")
+@click.option(
+    "--prefix",
+    "prefixes",
+    multiple=True,
+    type=click.Choice(GC_PREFIXES),
+    help="Only collect under this prefix (repeatable; default: all).",
+)
+@click.option(
+    "--grace-hours",
+    default=GC_GRACE_HOURS,
+    show_default=True,
+    type=float,
+    help="Keep unreferenced objects younger than this.",
+)
+@click.option("--dry-run", is_flag=True, help="List what would be deleted.")
+@click.option("--force", is_flag=True, help="Collect even if no row references the prefix.")
+def gc_objects_command(prefixes, grace_hours, dry_run, force):
+    """Delete bucket objects that no database row references."""
+    for prefix in prefixes or GC_PREFIXES:
+        try:
+            stats = collect_orphans(prefix, timedelta(hours=grace_hours), dry_run, force)
+        except click.ClickException as exc:
+            click.echo(f"{prefix}: skipped, {exc.message}")
+            continue
+        verb = "would delete" if dry_run else "deleted"
+        click.echo(
+            f"{prefix}: scanned {stats['scanned']}, referenced {stats['referenced']}, "
+            f"within grace {stats['recent']}, {verb} {stats['orphaned'] - stats['failed']} "
+            f"({stats['bytes'] / 1e6:.1f} MB), failed {stats['failed']}"
+        )
+
+
+# Bulk import: a manifest (CSV or JSON) describes one design per row and names
+# its image file, either inside an uploaded zip `archive` or among `images`.
+MAX_BULK_IMPORT = 1000
+BULK_UPLOAD_WORKERS = int(os.getenv("BULK_UPLOAD_WORKERS", "8"))
+
+
+def parse_manifest(storage):
+    """Return manifest rows from an uploaded CSV or JSON file."""
+    raw = storage.read().decode("utf-8-sig")
+    if (storage.filename or "").lower().endswith(".json") or raw.lstrip().startswith("["):
+        rows = json.loads(raw)
+        if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+            raise ValueError("JSON manifest must be a list of objects")
+        return rows
+    return list(csv.DictReader(io.StringIO(raw)))
+
+
+def manifest_flag(value):
+    return str(value or "").strip().lower() in ("1", "true", "yes")
+
+
+@app.route("/api/designs/bulk", methods=["POST"])
+def bulk_import_designs():
+    """Create many designs from a manifest plus a zip or multipart batch of images.
+
+    Returns a per-row report; rows that fail validation or upload are skipped
+    and every other row is inserted in a single transaction.
+    """
+    manifest = request.files.get("manifest")
+    if not manifest:
+        return jsonify(error="Missing fields: manifest"), 400
+    try:
+        rows = parse_manifest(manifest)
+    except (ValueError, UnicodeDecodeError, csv.Error) as exc:
+        return jsonify(error=f"Invalid manifest: {exc}"), 400
+    if not rows:
+        return jsonify(error="Manifest is empty"), 400
+    if len(rows) > MAX_BULK_IMPORT:
+        return jsonify(error=f"At most {MAX_BULK_IMPORT} rows per import"), 400
+
+    archive = request.files.get("archive")
+    zf = None
+    files = {}
+    if archive:
+        try:
+            zf = zipfile.ZipFile(archive.stream)
+        except zipfile.BadZipFile:
+            return jsonify(error="archive is not a zip file"), 400
+    sources = [info for info in zf.infolist() if not info.is_dir()] if zf else []
+    sources += request.files.getlist("images")
+    ambiguous = set()
+    for source in sources:
+        # ZipInfo and FileStorage both carry the original name as .filename
+        name = os.path.basename(source.filename or "")
+        if name in files:
+            ambiguous.add(name)
+        files[name] = source
+
+    results = [{"row": i, "title": (r.get("title") or None)} for i, r in enumerate(rows)]
+    categories_by_id = {c.id: c for c in Category.query}
+    categories_by_name = {c.name.lower(): c for c in categories_by_id.values()}
+    titles = [r.get("title") for r in rows if r.get("title")]
+    taken = set(
+        db.session.scalars(select(Design.title).where(Design.title.in_(titles)))
+    ) if titles else set()
+
+    pending = []
+    for result, row in zip(results, rows):
+        title = row.get("title") or None
+        category = None
+        if row.get("category_id"):
+            try:
+                category = categories_by_id.get(int(row["category_id"]))
+            except (TypeError, ValueError):
+                pass
+        elif row.get("category"):
+            category = categories_by_name.get(str(row["category"]).strip().lower())
+        filename = os.path.basename(str(row.get("filename") or ""))
+        source = files.get(filename)
+        if not category:
+            result["error"] = "Unknown category"
+        elif filename in ambiguous:
+            result["error"] = f"More than one image is named {filename}"
+        elif source is None:
+            result["error"] = "Image not found"
+        elif title in taken:
+            result["error"] = "Title already exists"
+        else:
+            if title:
+                taken.add(title)
+            pending.append((result, row, category, source))
+
+    read_lock = threading.Lock()
+
+    def upload(source, key):
+        content_type = mimetypes.guess_type(key)[0] or "image/jpeg"
+        # Several rows may name the same file, so each upload reads its own copy
+        with read_lock:
+            if isinstance(source, zipfile.ZipInfo):
+                body = io.BytesIO(zf.read(source))
+            else:
+                source.stream.seek(0)
+                body = io.BytesIO(source.stream.read())
+                content_type = source.mimetype or content_type
+        get_s3().upload_fileobj(body, BUCKET, key, ExtraArgs={"ContentType": content_type})
+
+    uploaded = []
+    with ThreadPoolExecutor(BULK_UPLOAD_WORKERS) as pool:
+        futures = []
+        for result, row, category, source in pending:
+            key = new_object_key("designs", os.path.basename(source.filename or ""))
+            futures.append((pool.submit(upload, source, key), result, row, category, key))
+        for future, result, row, category, key in futures:
+            try:
+                future.result()
+            except Exception as exc:
+                result["error"] = f"Upload failed: {exc}"
+                continue
+            uploaded.append((result, row, category, key))
+
+    created = []
+    for result, row, category, key in uploaded:
+        design = Design(
+            category_id=category.id,
+            title=row.get("title") or None,
+            image_filename=key,
+            poster_type=row.get("poster_type") or None,
+            size=row.get("size") or None,
+            thickness=row.get("thickness") or None,
+            featured=manifest_flag(row.get("featured")),
+            hidden=manifest_flag(row.get("hidden")),
+        )
+        db.session.add(design)
+        created.append((result, design))
+    if created:
+        db.session.flush()
+        for _, design in created:
+            db.session.add_all(
+                DesignSearchTerm(design_id=design.id, term=term, weight=weight)
+                for term, weight in search_terms_for(
+                    design, categories_by_id[design.category_id]
+                ).items()
+            )
+        response_cache.bump("designs")
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        # Nothing was saved; don't leave the uploaded images behind.
+        enqueue_object_deletes([key for _, _, _, key in uploaded])
+        db.session.commit()
+        storage_jobs.wake()
+        raise
+
+    for result, design in created:
+        result["id"] = design.id
+        image_jobs.submit(design.id, design.image_filename)
+    failed = sum(1 for r in results if "error" in r)
+    return (
+        jsonify(created=len(created), failed=failed, results=results),
+        201 if created else 400,
+    )
 
 
 @app.route("/api/designs/<int:design_id>", methods=["GET", "PUT", "DELETE"])
+@cached_get("designs")
 def design_detail(design_id):
     design = Design.query.get_or_404(design_id)
     if request.method == "GET":
@@ -598,25 +3222,61 @@ def design_detail(design_id):
                         value = value.split(f"/{BUCKET}/", 1)[1]
                     value = value.lstrip("/")
                 setattr(design, field, value)
+        if "title" in data or "category_id" in data:
+            index_design(design)
+        image_changed = inspect(design).attrs.image_filename.history.has_changes()
+        if image_changed:
+            design.image_variants = None
+        response_cache.bump("designs")
         db.session.commit()
+        if image_changed and design.image_filename:
+            image_jobs.submit(design.id, design.image_filename)
         return jsonify(id=design.id)
 
-    # Remove associated image from Wasabi before deleting record
-    try:
-        get_s3().delete_object(Bucket=BUCKET, Key=design.image_filename)
-    except Exception:
-        pass
-    # Delete any related ProductPerformance stats to avoid FK constraint errors
-    stat = ProductPerformance.query.filter_by(design_id=design.id).first()
-    if stat:
-        db.session.delete(stat)
-
-    db.session.delete(design)
+    # The image and its variants are removed from Wasabi once the row is gone
+    enqueue_object_deletes(design_object_keys(design.image_filename, design.image_variants))
+    purge_designs([design.id])
     db.session.commit()
+    storage_jobs.wake()
     return jsonify(message="Deleted")
 
 
+@app.route("/api/designs/bulk", methods=["DELETE"])
+def bulk_delete_designs():
+    """Delete designs by ``ids`` and/or every design in ``category_id``."""
+    data = request.get_json() or {}
+    ids = data.get("ids") or []
+    category_id = data.get("category_id")
+    if not isinstance(ids, list) or not all(
+        isinstance(i, int) and not isinstance(i, bool) for i in ids
+    ):
+        return jsonify(error="ids must be a list of design ids"), 400
+    if not ids and category_id is None:
+        return jsonify(error="Missing fields: ids or category_id"), 400
+
+    conditions = []
+    if ids:
+        conditions.append(Design.id.in_(ids))
+    if category_id is not None:
+        conditions.append(Design.category_id == category_id)
+    targets = db.session.execute(
+        select(Design.id, Design.image_filename, Design.image_variants).where(
+            or_(*conditions)
+        )
+    ).all()
+
+    keys = []
+    for _, image_filename, image_variants in targets:
+        keys += design_object_keys(image_filename, image_variants)
+    queued = enqueue_object_deletes(keys)
+    purge_designs([t.id for t in targets])
+    db.session.commit()
+    storage_jobs.wake()
+    return jsonify(deleted=len(targets), queued_objects=queued)
+
+
 @app.route("/api/discounts/posters", methods=["GET", "POST"])
+@cached_get("discounts")
 def poster_discounts():
     if request.method == "POST":
         data = request.get_json() or {}
@@ -631,6 +3291,7 @@ def poster_discounts():
             amount=data.get("amount", 0),
         )
         db.session.add(discount)
+        response_cache.bump("discounts")
         db.session.commit()
         return jsonify(serialize_poster_discount(discount)), 201
 
@@ -642,11 +3303,13 @@ def poster_discounts():
 def poster_discount_detail(discount_id):
     discount = PosterDiscount.query.get_or_404(discount_id)
     db.session.delete(discount)
+    response_cache.bump("discounts")
     db.session.commit()
     return jsonify(message="Deleted")
 
 
 @app.route("/api/discounts/promo", methods=["GET", "POST"])
+@cached_get("discounts")
 def promo_codes():
     if request.method == "POST":
         data = request.get_json() or {}
@@ -661,6 +3324,7 @@ def promo_codes():
             amount=data.get("amount", 0),
         )
         db.session.add(promo)
+        response_cache.bump("discounts")
         db.session.commit()
         return jsonify(serialize_promo_code(promo)), 201
 
@@ -672,33 +3336,48 @@ def promo_codes():
 def promo_code_detail(promo_id):
     promo = PromoCode.query.get_or_404(promo_id)
     db.session.delete(promo)
+    response_cache.bump("discounts")
     db.session.commit()
     return jsonify(message="Deleted")
 
 
 @app.route("/api/custom-orders", methods=["POST", "GET"])
+@rate_limit("custom_orders", "10/minute")
 def custom_orders():
     if request.method == "POST":
-        user_id = request.form.get("user_id")
-        poster_type = request.form.get("poster_type")
-        size = request.form.get("size")
-        thickness = request.form.get("thickness")
+        # Either a multipart upload, or fields naming an object already
+        # uploaded through /api/uploads as `file_key`.
+        form = (request.get_json() if request.is_json else request.form) or {}
+        user_id = form.get("user_id")
+        poster_type = form.get("poster_type")
+        size = form.get("size")
+        thickness = form.get("thickness")
         upload = request.files.get("file")
+        file_key = form.get("file_key")
 
         missing = []
         for field_name, value in [
             ("poster_type", poster_type),
             ("size", size),
             ("thickness", thickness),
-            ("file", upload),
+            ("file", upload or file_key),
         ]:
             if not value:
                 missing.append(field_name)
         if missing:
             return jsonify(error=f"Missing fields: {', '.join(missing)}"), 400
 
-        order_code = uuid.uuid4().hex[:8]
-        key = save_file(upload, prefix=f"custom_orders/{order_code}")
+        if upload:
+            order_code = uuid.uuid4().hex[:8]
+            key = save_file(upload, prefix=f"custom_orders/{order_code}")
+        else:
+            error = verify_upload(file_key, "custom_orders")
+            if error:
+                return jsonify(error=error), 400
+            order_code = UPLOAD_KEY_PATTERNS["custom_orders"].match(file_key).group(1)
+            if CustomOrder.query.filter_by(order_code=order_code).first():
+                return jsonify(error="Upload already used"), 400
+            key = file_key
 
         order = CustomOrder(
             user_id=user_id,
@@ -713,24 +3392,47 @@ def custom_orders():
         db.session.commit()
         return jsonify(order_code=order_code), 201
 
-    orders = CustomOrder.query.order_by(CustomOrder.created_at.desc()).all()
+    try:
+        paginate, limit, cursor = page_args()
+    except ValueError as exc:
+        return jsonify(error=str(exc)), 400
+
+    query = CustomOrder.query.order_by(
+        CustomOrder.created_at.desc(), CustomOrder.id.desc()
+    )
+    if cursor:
+        try:
+            query = query.filter(created_before(CustomOrder, cursor))
+        except ValueError as exc:
+            return jsonify(error=str(exc)), 400
+    if paginate:
+        orders, has_more = fetch_page(query, limit)
+    else:
+        orders, has_more = query.all(), False
+    response = [
+        {
+            "id": o.id,
+            "order_code": o.order_code,
+            "user_id": o.user_id,
+            "poster_type": o.poster_type,
+            "size": o.size,
+            "thickness": o.thickness,
+            "file_path": o.file_path,
+            "status": o.status,
+        }
+        for o in orders
+    ]
+    if not paginate:
+        return jsonify(response)
     return jsonify(
-        [
-            {
-                "id": o.id,
-                "order_code": o.order_code,
-                "user_id": o.user_id,
-                "poster_type": o.poster_type,
-                "size": o.size,
-                "thickness": o.thickness,
-                "file_path": o.file_path,
-                "status": o.status,
-            }
-            for o in orders
-        ]
+        items=response,
+        next_cursor=created_cursor(orders[-1]) if has_more else None,
     )
 
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
 @app.route("/api/custom-orders/<string:order_code>/download")
 def download_custom_order(order_code):
     """Allow admin to download the original custom design."""
@@ -738,15 +3440,58 @@ def download_custom_order(order_code):
     if not order.file_path:
         return jsonify(error="File not found"), 404
     s3 = get_s3()
+    params = {"Bucket": BUCKET, "Key": order.file_path}
+    # Honour a single byte range so interrupted downloads can resume. If-Range
+    # must be a strong ETag; anything else gets the whole file (RFC 9110).
+    byte_range = request.range
+    if byte_range and byte_range.units == "bytes" and len(byte_range.ranges) == 1:
+        if_range = request.headers.get("If-Range")
+        if not if_range or if_range.startswith('"'):
+            params["Range"] = byte_range.to_header()
+        if if_range and "Range" in params:
+            params["IfMatch"] = if_range
     try:
-        obj = s3.get_object(Bucket=BUCKET, Key=order.file_path)
-    except Exception:
-        return jsonify(error="File not found"), 404
-    return send_file(
-        io.BytesIO(obj["Body"].read()),
-        download_name=os.path.basename(order.file_path),
-        as_attachment=True,
+        obj = s3.get_object(**params)
+    except ClientError as exc:
+        code = exc.response["Error"]["Code"]
+        if code == "InvalidRange":
+            return jsonify(error="Requested range not satisfiable"), 416
+        if code not in ("PreconditionFailed", "412"):
+            return jsonify(error="File not found"), 404
+        # The file changed since the partial download began; start over.
+        params.pop("Range")
+        params.pop("IfMatch")
+        try:
+            obj = s3.get_object(**params)
+        except ClientError:
+            return jsonify(error="File not found"), 404
+
+    body = obj["Body"]
+
+    def stream():
+        try:
+            yield from body.iter_chunks(DOWNLOAD_CHUNK_SIZE)
+        finally:
+            body.close()
+
+    response = Response(
+        stream(),
+        status=206 if "ContentRange" in obj else 200,
+        mimetype=obj.get("ContentType") or "application/octet-stream",
+        direct_passthrough=True,
     )
+    response.headers["Content-Length"] = str(obj["ContentLength"])
+    response.headers["Accept-Ranges"] = "bytes"
+    if "ContentRange" in obj:
+        response.headers["Content-Range"] = obj["ContentRange"]
+    if obj.get("ETag"):
+        response.headers["ETag"] = obj["ETag"]
+    response.headers.set(
+        "Content-Disposition",
+        "attachment",
+        filename=os.path.basename(order.file_path),
+    )
+    return response
 
 
 @app.route("/api/custom-orders/<string:order_code>", methods=["DELETE"])
@@ -754,34 +3499,43 @@ def delete_custom_order(order_code):
     """Delete the custom design and its record, and remove references in orders."""
     custom_order = CustomOrder.query.filter_by(order_code=order_code).first_or_404()
     if custom_order.file_path:
-        try:
-            get_s3().delete_object(Bucket=BUCKET, Key=custom_order.file_path)
-        except Exception:
-            pass
-
-    related_orders = Order.query.filter(Order.items.contains(order_code)).all()
-    for ord_ in related_orders:
-        items = json.loads(ord_.items or "[]")
-        changed = False
-        for item in items:
-            if item.get("orderCode") == order_code:
-                item.pop("orderCode", None)
-                changed = True
-        if changed:
-            ord_.items = json.dumps(items)
+        enqueue_object_deletes([custom_order.file_path])
+
+    OrderItem.query.filter_by(custom_order_code=order_code).update(
+        {"custom_order_code": None}, synchronize_session=False
+    )
 
     db.session.delete(custom_order)
     db.session.commit()
+    storage_jobs.wake()
     return jsonify(message="Deleted")
 
 
+@app.route("/api/quote", methods=["POST"])
+@rate_limit("quote", "60/minute")
+def quote():
+    """Price a whole cart, including discounts, promo code and delivery."""
+    data = request.get_json() or {}
+    items = data.get("items")
+    if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+        return jsonify(error="items must be a list of objects"), 400
+    try:
+        result = pricing.quote_cart(
+            items, discount_index(), data.get("promo_code"), data.get("city")
+        )
+    except pricing.PricingError as exc:
+        return jsonify(error=str(exc)), 400
+    return jsonify(result)
+
+
 @app.route("/api/orders", methods=["POST", "GET"])
+@rate_limit("orders", "10/minute")
 def orders():
     if request.method == "POST":
         data = request.get_json() or {}
 
-        # required presence (total_price can be 0, so only check presence)
-        presence_missing = [f for f in ["items", "total_price"] if f not in data]
+        # required presence (an empty cart is still an explicit items list)
+        presence_missing = [f for f in ["items"] if f not in data]
 
         # required non-empty fields
         empties = [f for f in ["name", "phone", "address", "city"] if not data.get(f)]
@@ -789,6 +3543,26 @@ def orders():
         missing = presence_missing + empties
         if missing:
             return jsonify(error=f"Missing fields: {', '.join(missing)}"), 400
+        items = data.get("items")
+        if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+            return jsonify(error="items must be a list of objects"), 400
+        # The client's total_price and item prices are ignored; both are
+        # always recomputed.
+        try:
+            priced = pricing.quote_cart(
+                items, discount_index(), data.get("promo_code"), data.get("city")
+            )
+        except pricing.PricingError as exc:
+            return jsonify(error=str(exc)), 400
+        if priced.get("promo_error"):
+            return jsonify(error=priced["promo_error"]), 400
+        try:
+            line_items = build_order_items(items)
+        except ValueError as exc:
+            return jsonify(error=str(exc)), 400
+        # Store the price list's unit price, not whatever the client sent
+        for row, line in zip(line_items, priced["items"]):
+            row.price = line["unit_price"]
 
         code = generate_order_code()
         order = Order(
@@ -800,75 +3574,232 @@ def orders():
             city=data.get("city"),
             postal_code=data.get("postal_code"),
             payment_method=data.get("payment_method", "cod"),
-            items=json.dumps(data.get("items")),
-            total_price=data.get("total_price", 0),
+            items="[]",
+            total_price=priced["total"],
         )
+        order.line_items = line_items
         db.session.add(order)
+        db.session.flush()
+        record_order_sales(order, order.status)
         db.session.commit()
-        return jsonify(message="Order placed", order_id=f"#{code}"), 201
+        return (
+            jsonify(message="Order placed", order_id=f"#{code}", total_price=priced["total"]),
+            201,
+        )
+
+    try:
+        paginate, limit, cursor = page_args()
+    except ValueError as exc:
+        return jsonify(error=str(exc)), 400
 
     email = request.args.get("email")
-    query = Order.query.order_by(Order.created_at.desc())
+    query = Order.query.options(selectinload(Order.line_items)).order_by(
+        Order.created_at.desc(), Order.id.desc()
+    )
     if email:
         query = query.filter_by(email=email)
-    orders_list = query.all()
-    response = []
-    for o in orders_list:
-        items = json.loads(o.items or "[]")
-        if email:
-            # hide internal orderCode markers for customer view
-            for item in items:
-                item.pop("orderCode", None)
-        response.append(
-            {
-                "id": o.id,
-                "order_code": o.order_code,
-                "name": o.name,
-                "email": o.email,
-                "phone": o.phone,
-                "address": o.address,
-                "city": o.city,
-                "postal_code": o.postal_code,
-                "payment_method": o.payment_method,
-                "status": o.status,
-                "items": items,
-                "total_price": o.total_price,
-                "created_at": o.created_at.isoformat(),
-            }
+    if cursor:
+        try:
+            query = query.filter(created_before(Order, cursor))
+        except ValueError as exc:
+            return jsonify(error=str(exc)), 400
+    if paginate:
+        orders_list, has_more = fetch_page(query, limit)
+    else:
+        orders_list, has_more = query.all(), False
+    # hide internal orderCode markers for customer view
+    response = [serialize_order(o, include_codes=not email) for o in orders_list]
+    if not paginate:
+        return jsonify(response)
+    return jsonify(
+        items=response,
+        next_cursor=created_cursor(orders_list[-1]) if has_more else None,
+    )
+
+
+ORDER_STATUSES = ("pending", "confirmed", "processing", "delivered", "cancelled")
+
+# Order export: one line per line item (orders without items get one line with
+# empty item fields), streamed from a server-side cursor so memory stays flat
+# however many orders match.
+EXPORT_BATCH = 1000
+EXPORT_COLUMNS = [
+    ("order_id", Order.id),
+    ("order_code", Order.order_code),
+    ("created_at", Order.created_at),
+    ("status", Order.status),
+    ("name", Order.name),
+    ("email", Order.email),
+    ("phone", Order.phone),
+    ("address", Order.address),
+    ("city", Order.city),
+    ("postal_code", Order.postal_code),
+    ("payment_method", Order.payment_method),
+    ("order_total", Order.total_price),
+    ("item_position", OrderItem.position),
+    ("design_id", OrderItem.design_id),
+    ("custom_order_code", OrderItem.custom_order_code),
+    ("title", OrderItem.title),
+    ("image", OrderItem.image),
+    ("poster_type", OrderItem.poster_type),
+    ("size", OrderItem.size),
+    ("thickness", OrderItem.thickness),
+    ("price", OrderItem.price),
+    ("quantity", OrderItem.quantity),
+    ("extra", OrderItem.extra),
+]
+
+
+def export_rows(start=None, end=None, statuses=None):
+    """Yield one tuple of EXPORT_COLUMNS values per order line item."""
+    stmt = (
+        select(*(column for _, column in EXPORT_COLUMNS))
+        .select_from(Order)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .order_by(Order.created_at, Order.id, OrderItem.position, OrderItem.id)
+    )
+    if start:
+        stmt = stmt.where(Order.created_at >= datetime.combine(start, datetime.min.time()))
+    if end:
+        stmt = stmt.where(
+            Order.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time())
         )
-    return jsonify(response)
+    if statuses:
+        stmt = stmt.where(Order.status.in_(statuses))
+    result = db.session.execute(
+        stmt.execution_options(stream_results=True, yield_per=EXPORT_BATCH)
+    )
+    for partition in result.partitions():
+        yield from partition
+
+
+def export_csv(rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for n, row in enumerate(rows, 1):
+        writer.writerow(
+            value.isoformat() if isinstance(value, datetime) else value for value in row
+        )
+        if n % EXPORT_BATCH == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+def export_ndjson(rows):
+    names = [name for name, _ in EXPORT_COLUMNS]
+    lines = []
+    for row in rows:
+        record = dict(zip(names, row))
+        record["created_at"] = record["created_at"].isoformat() if record["created_at"] else None
+        record["extra"] = app.json.loads(record["extra"]) if record["extra"] else None
+        lines.append(app.json.dumps(record))
+        if len(lines) >= EXPORT_BATCH:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+@app.route("/api/orders/export")
+def export_orders():
+    """Stream orders as CSV (default) or NDJSON, one line per line item.
+
+    Filters: ``start`` and ``end`` (inclusive ``YYYY-MM-DD`` creation dates)
+    and ``status`` (comma-separated).
+    """
+    export_format = request.args.get("format", "csv")
+    if export_format not in ("csv", "ndjson"):
+        return jsonify(error="format must be 'csv' or 'ndjson'"), 400
+    try:
+        start, end = (
+            date.fromisoformat(request.args[k]) if k in request.args else None
+            for k in ("start", "end")
+        )
+    except ValueError:
+        return jsonify(error="start and end must be YYYY-MM-DD dates"), 400
+    statuses = [s for s in request.args.get("status", "").split(",") if s]
+    unknown = [s for s in statuses if s not in ORDER_STATUSES]
+    if unknown:
+        return jsonify(error=f"Invalid status: {', '.join(unknown)}"), 400
+
+    rows = export_rows(start, end, statuses)
+    if export_format == "csv":
+        body, mimetype = export_csv(rows), "text/csv"
+    else:
+        body, mimetype = export_ndjson(rows), "application/x-ndjson"
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    filename = f"orders-{datetime.utcnow():%Y%m%d}.{export_format}"
+    response.headers.set("Content-Disposition", "attachment", filename=filename)
+    return response
 
 
 @app.route("/api/orders/<int:order_id>", methods=["PATCH"])
 def update_order(order_id):
     data = request.get_json() or {}
     status = data.get("status")
-    valid_statuses = {"pending", "confirmed", "processing", "delivered", "cancelled"}
-    if status not in valid_statuses:
+    if status not in ORDER_STATUSES:
         return jsonify(error="Invalid status"), 400
     order = Order.query.get_or_404(order_id)
-    order.status = status
+    change_order_status(order, status)
     db.session.commit()
     return jsonify(message="Status updated")
 
 
+@app.route("/api/analytics")
+def analytics():
+    period = request.args.get("period", "day")
+    if period not in ANALYTICS_PERIODS:
+        return jsonify(error=f"period must be one of: {', '.join(ANALYTICS_PERIODS)}"), 400
+    try:
+        end = datetime.utcnow().date()
+        if "end" in request.args:
+            end = date.fromisoformat(request.args["end"])
+        if "start" in request.args:
+            start = date.fromisoformat(request.args["start"])
+        else:
+            start = bucket_start(end, period)
+            for _ in range(ANALYTICS_DEFAULT_SPAN[period] - 1):
+                start = bucket_start(start - timedelta(days=1), period)
+    except ValueError:
+        return jsonify(error="start and end must be YYYY-MM-DD dates"), 400
+    if start > end:
+        return jsonify(error="start must not be after end"), 400
+    try:
+        top = int(request.args.get("top", ANALYTICS_TOP_DESIGNS))
+        if not 0 <= top <= ANALYTICS_MAX_TOP:
+            raise ValueError
+    except ValueError:
+        return jsonify(error=f"top must be an integer 0-{ANALYTICS_MAX_TOP}"), 400
+    try:
+        return jsonify(sales_report(period, start, end, top))
+    except ValueError as exc:
+        return jsonify(error=str(exc)), 400
+
+
 @app.route("/api/product-performance", methods=["GET", "POST"])
+@rate_limit("product_performance", "60/minute")
 def product_performance():
     if request.method == "POST":
         data = request.get_json() or {}
         design_id = data.get("design_id")
         if not design_id:
             return jsonify(error="design_id required"), 400
-        stat = ProductPerformance.query.filter_by(design_id=design_id).first()
-        if stat:
-            stat.count += 1
-        else:
-            stat = ProductPerformance(design_id=design_id, count=1)
-            db.session.add(stat)
-        db.session.commit()
+        try:
+            design_id = int(design_id)
+        except (TypeError, ValueError):
+            return jsonify(error="Invalid design_id"), 400
+        view_counts.add(design_id)
         return jsonify(message="Recorded"), 201
 
-    stats = ProductPerformance.query.join(Design).all()
+    view_counts.flush()
+    stats = (
+        ProductPerformance.query.join(Design)
+        .options(contains_eager(ProductPerformance.design))
+        .all()
+    )
     return jsonify(
         [
             {"design_id": s.design_id, "title": s.design.title if s.design else None, "count": s.count}
@@ -878,9 +3809,14 @@ def product_performance():
 
 
 @app.route("/api/bestsellers")
+@cached_get("designs", args=("variant",))
 def bestsellers():
+    try:
+        variant = requested_variant()
+    except ValueError as exc:
+        return jsonify(error=str(exc)), 400
     designs = Design.query.filter_by(featured=True, hidden=False).all()
-    return jsonify([serialize_design(d) for d in designs])
+    return jsonify(serialize_designs(designs, wants_image_urls(), variant))
 
 
 @app.route("/api/hello")
@@ -888,6 +3824,9 @@ def hello():
     return jsonify(message="Hello from Flask!")
 
 
+STARTUP_SECONDS = time.perf_counter() - _IMPORT_STARTED
+app.logger.info("app module loaded in %.3fs", STARTUP_SECONDS)
+
 # -------------------------------------------------
 # Main
 # -------------------------------------------------
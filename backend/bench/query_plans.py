@@ -0,0 +1,145 @@
+"""Check that the hot API routes are served by indexes.
+
+    cd backend && python -m bench.query_plans [--database-url URL]
+
+Seeds a synthetic catalog and order history into a scratch database (a
+temporary SQLite file unless ``--database-url`` is given), replays the hot
+routes through the Flask test client and runs EXPLAIN on every SELECT they
+issue. Exits non-zero if a statement is planned as a full scan of a table
+outside ``SMALL_TABLES``.
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+# Reference data that routes read whole or that only ever holds a few rows
+SMALL_TABLES = {
+    "category",
+    "poster_discount",
+    "promo_code",
+    "cache_generation",
+    "order_code_counter",
+}
+
+SQLITE_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def hot_requests(sample):
+    """(label, method, url, json) for the routes the storefront and admin hit."""
+    return [
+        ("designs by category", "GET", f"/api/designs?category_id={sample['category_id']}&limit=50", None),
+        ("designs by main category", "GET", f"/api/designs?main_category={sample['main_category']}&limit=50", None),
+        ("featured designs", "GET", "/api/designs?featured=true&hidden=false&limit=50", None),
+        ("design search", "GET", f"/api/designs?search={sample['search']}&limit=50", None),
+        ("design detail", "GET", f"/api/designs/{sample['design_id']}", None),
+        ("bestsellers", "GET", "/api/bestsellers", None),
+        ("orders page", "GET", "/api/orders?limit=50", None),
+        ("orders by email", "GET", f"/api/orders?email={sample['email']}&limit=50", None),
+        ("custom orders page", "GET", "/api/custom-orders?limit=50", None),
+        (
+            "place order",
+            "POST",
+            "/api/orders",
+            {
+                "name": "Plan Check",
+                "email": sample["email"],
+                "phone": "+8801700000000",
+                "address": "House 1",
+                "city": "Dhaka",
+                "items": [
+                    {"title": "x", "image": sample["image_key"], "type": "PVC Poster", "size": "12x18", "quantity": 1}
+                ],
+            },
+        ),
+        ("delete custom order", "DELETE", f"/api/custom-orders/{sample['custom_order_code']}", None),
+    ]
+
+
+def capture_statements(engine):
+    """Start recording SELECTs run on ``engine``; return the shared list."""
+    from sqlalchemy import event
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    return statements
+
+
+def full_scans(conn, statement, parameters):
+    """Tables ``statement`` would scan in full, plus the raw plan lines."""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+        lines = [row[-1] for row in rows]
+        scans = [m.group(1) for m in map(SQLITE_SCAN.match, lines) if m]
+    else:
+        rows = conn.exec_driver_sql("EXPLAIN " + statement, parameters).fetchall()
+        lines = [row[0] for row in rows]
+        scans = [m.group(1) for line in lines for m in POSTGRES_SCAN.finditer(line)]
+    return scans, lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="scratch database (default: temporary SQLite file)")
+    parser.add_argument("--designs", type=int, default=20000)
+    parser.add_argument("--orders", type=int, default=50000)
+    parser.add_argument("--categories", type=int, default=200)
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args(argv)
+
+    tmpdir = tempfile.TemporaryDirectory()
+    os.environ["RATE_LIMIT_ENABLED"] = "0"
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tmpdir.name}/plans.db"
+
+    from bench import synthetic
+    from app import app, db
+
+    with app.app_context():
+        print(f"Seeding {args.designs} designs and {args.orders} orders...", file=sys.stderr)
+        sample = synthetic.seed(args.designs, args.orders, args.categories)
+        tables = set(db.metadata.tables)
+        statements = capture_statements(db.engine)
+        client = app.test_client()
+        failures = 0
+        with db.engine.connect() as conn:
+            for label, method, url, body in hot_requests(sample):
+                del statements[:]
+                resp = client.open(url, method=method, json=body)
+                if resp.status_code >= 400:
+                    print(f"ERROR {label}: {method} {url} -> {resp.status_code}")
+                    failures += 1
+                    continue
+                clean = True
+                for statement, parameters in list(statements):
+                    scans, plan = full_scans(conn, statement, parameters)
+                    bad = sorted({t for t in scans if t in tables and t not in SMALL_TABLES})
+                    if bad:
+                        clean = False
+                        failures += 1
+                        print(f"FULL SCAN {label}: {', '.join(bad)}")
+                    if bad or args.verbose:
+                        print("  " + " ".join(statement.split()))
+                        print("\n".join("    " + line for line in plan))
+                if clean:
+                    print(f"ok   {label}")
+        db.session.remove()
+        db.engine.dispose()
+    tmpdir.cleanup()
+    if failures:
+        print(f"{failures} problem(s) found")
+        return 1
+    print("All hot queries use indexes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""Offline latency and throughput benchmark for the hot API routes.
+
+    cd backend && pip install -r bench/requirements.txt
+    python -m bench.routes --output bench-results.json [--baseline old.json]
+
+Seeds a synthetic catalog and order history into a scratch database (a
+temporary SQLite file unless ``--database-url`` is given), stands in for
+Wasabi with moto's in-process S3 and drives each scenario through the Flask
+test client from ``--concurrency`` threads. The response cache is off except
+in the ``*_cached`` scenarios, which time cache hits on the same routes, so the
+other numbers measure the route itself. Results are written as JSON; with
+``--baseline`` the run is compared against an earlier results file and exits
+non-zero when a scenario's p95 latency regressed by more than
+``--max-regression``.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+FAKE_S3 = {
+    "WASABI_KEY": "bench",
+    "WASABI_SECRET": "bench",
+    "WASABI_BUCKET": "bench",
+    "WASABI_REGION": "us-east-1",
+    "WASABI_ENDPOINT": "https://s3.us-east-1.amazonaws.com",
+}
+PERCENTILES = (50, 90, 95, 99)
+# Scenarios that keep the response cache on; every other scenario runs with it off
+CACHED_SCENARIOS = {"designs_list_cached", "bestsellers_cached"}
+
+
+def scenarios(sample):
+    """name -> callable(i) returning (method, url, json body) for request i."""
+    categories = sample["categories"]
+    words = sample["words"]
+    keys = sample["image_keys"]
+    designs = sample["design_ids"]
+
+    def order(i):
+        return {
+            "name": "Bench",
+            "email": f"bench{i % 50}@example.com",
+            "phone": "+8801700000000",
+            "address": "House 1",
+            "city": "Dhaka",
+            "items": [
+                {"image": keys[i % len(keys)], "type": "PVC Poster", "size": "12x18", "quantity": 1}
+            ],
+        }
+
+    return {
+        "designs_list": lambda i: ("GET", "/api/designs?limit=50", None),
+        "designs_list_cached": lambda i: ("GET", "/api/designs?limit=50", None),
+        "designs_by_category": lambda i: (
+            "GET", f"/api/designs?category_id={categories[i % len(categories)]}&limit=50", None
+        ),
+        "designs_with_urls": lambda i: (
+            "GET",
+            f"/api/designs?category_id={categories[i % len(categories)]}&limit=50&with_urls=1",
+            None,
+        ),
+        "designs_search": lambda i: (
+            "GET", f"/api/designs?search={words[i % len(words)]}&limit=50", None
+        ),
+        "get_image": lambda i: ("GET", f"/api/image/{keys[i % len(keys)]}", None),
+        "bestsellers": lambda i: ("GET", "/api/bestsellers", None),
+        "bestsellers_cached": lambda i: ("GET", "/api/bestsellers", None),
+        "orders_post": lambda i: ("POST", "/api/orders", order(i)),
+        "orders_get": lambda i: ("GET", "/api/orders?limit=50", None),
+        "orders_by_email": lambda i: (
+            "GET", f"/api/orders?email={sample['emails'][i % len(sample['emails'])]}&limit=50", None
+        ),
+        "product_performance_post": lambda i: (
+            "POST", "/api/product-performance", {"design_id": designs[i % len(designs)]}
+        ),
+    }
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def run_scenario(app, build, requests, concurrency, warmup):
+    client = app.test_client()
+    for i in range(warmup):
+        method, url, body = build(i)
+        client.open(url, method=method, json=body)
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker():
+        local_client = app.test_client()
+        local = []
+        failed = []
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            method, url, body = build(warmup + i)
+            started = time.perf_counter()
+            resp = local_client.open(url, method=method, json=body)
+            local.append(time.perf_counter() - started)
+            if resp.status_code >= 400:
+                failed.append(resp.status_code)
+        with lock:
+            latencies.extend(local)
+            errors.extend(failed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [v * 1000 for v in latencies]
+    result = {
+        "requests": len(ms),
+        "errors": len(errors),
+        "seconds": round(elapsed, 4),
+        "throughput_rps": round(len(ms) / elapsed, 2) if elapsed else None,
+        "latency_ms": {
+            "min": round(ms[0], 3),
+            "mean": round(sum(ms) / len(ms), 3),
+            "max": round(ms[-1], 3),
+            **{f"p{p}": round(percentile(ms, p), 3) for p in PERCENTILES},
+        },
+    }
+    if errors:
+        result["error_statuses"] = sorted(set(errors))
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, max_regression):
+    """Print p50/p95/throughput deltas; return the regressed scenario names."""
+    regressed = []
+    print(f"\n{'scenario':28} {'p50 ms':>16} {'p95 ms':>16} {'req/s':>16}")
+    for name, current in results["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+
+        def delta(new, old):
+            return f"{new:8.2f} ({(new - old) / old:+.0%})" if old else f"{new:8.2f}"
+
+        cur, old = current["latency_ms"], before["latency_ms"]
+        print(
+            f"{name:28} {delta(cur['p50'], old['p50']):>16} {delta(cur['p95'], old['p95']):>16} "
+            f"{delta(current['throughput_rps'], before['throughput_rps']):>16}"
+        )
+        if old["p95"] and (cur["p95"] - old["p95"]) / old["p95"] > max_regression:
+            regressed.append(name)
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="scratch database (default: temporary SQLite file)")
+    parser.add_argument("--designs", type=int, default=5000)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--categories", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=300, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--only", action="append", help="run just this scenario (repeatable)")
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed p95 growth")
+    args = parser.parse_args(argv)
+
+    try:
+        from moto import mock_aws
+    except ImportError:
+        parser.error("moto is required: pip install -r bench/requirements.txt")
+
+    tmpdir = tempfile.TemporaryDirectory()
+    os.environ["RATE_LIMIT_ENABLED"] = "0"
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tmpdir.name}/bench.db"
+    os.environ.update(FAKE_S3)
+    s3_mock = mock_aws()
+    s3_mock.start()
+
+    import logging
+
+    from bench import synthetic
+    from app import Category, Design, Order, app, db, get_s3, response_cache, view_counts
+
+    app.logger.setLevel(logging.WARNING)
+    get_s3().create_bucket(Bucket=FAKE_S3["WASABI_BUCKET"])
+    with app.app_context():
+        print(f"Seeding {args.designs} designs and {args.orders} orders...", file=sys.stderr)
+        synthetic.seed(args.designs, args.orders, args.categories)
+        sample = {
+            "categories": [c for (c,) in db.session.query(Category.id).limit(50)],
+            "design_ids": [d for (d,) in db.session.query(Design.id).limit(500)],
+            "image_keys": [k for (k,) in db.session.query(Design.image_filename).limit(500)],
+            "emails": [e for (e,) in db.session.query(Order.email).distinct().limit(100)],
+            "words": synthetic.WORDS,
+        }
+        dialect = db.engine.dialect.name
+        db.session.remove()
+
+    plan = scenarios(sample)
+    unknown = set(args.only or ()) - set(plan)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "database": dialect,
+            "designs": args.designs,
+            "orders": args.orders,
+            "categories": args.categories,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+        },
+        "results": {},
+    }
+    cache_bytes = response_cache.maxbytes
+    for name, build in plan.items():
+        if args.only and name not in args.only:
+            continue
+        # A zero budget stores nothing, so uncached scenarios render every request
+        response_cache.clear()
+        response_cache.maxbytes = cache_bytes if name in CACHED_SCENARIOS else 0
+        result = run_scenario(app, build, args.requests, args.concurrency, args.warmup)
+        results["results"][name] = result
+        lat = result["latency_ms"]
+        print(
+            f"{name:28} p50 {lat['p50']:8.2f} ms  p95 {lat['p95']:8.2f} ms  "
+            f"{result['throughput_rps']:8.1f} req/s  errors {result['errors']}"
+        )
+    response_cache.maxbytes = cache_bytes
+    # Write buffered view counts while the scratch database still exists
+    view_counts.flush()
+    s3_mock.stop()
+    with app.app_context():
+        db.engine.dispose()
+    tmpdir.cleanup()
+
+    with open(args.output, "w") as fh:
+        json.dump(results, fh, indent=2)
+    print(f"Wrote {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressed = compare(results, json.load(fh), args.max_regression)
+        if regressed:
+            print(f"p95 regressed more than {args.max_regression:.0%}: {', '.join(regressed)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
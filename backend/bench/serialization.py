@@ -0,0 +1,116 @@
+"""Serialization time and bytes on the wire for the large list endpoints.
+
+    cd backend && python -m bench.serialization [--designs N] [--orders N]
+
+Seeds the synthetic catalog into a scratch database, builds the full
+``/api/designs`` and ``/api/orders`` payloads once, then times encoding them
+with Flask's default JSON provider and with orjson, and measures each
+response's size uncompressed, gzipped and (if brotli is installed) brotli
+compressed. Whole requests are timed with the response cache cleared before
+each one. Results are printed and written as JSON.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def best_of(fn, repeat):
+    """Fastest of ``repeat`` runs of ``fn``, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return round(min(timings) * 1000, 3)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="scratch database (default: temporary SQLite file)")
+    parser.add_argument("--designs", type=int, default=2000)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default="bench-serialization.json")
+    args = parser.parse_args(argv)
+
+    tmpdir = tempfile.TemporaryDirectory()
+    os.environ["RATE_LIMIT_ENABLED"] = "0"
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tmpdir.name}/serialization.db"
+
+    from flask.json.provider import DefaultJSONProvider
+
+    from bench import synthetic
+    from app import OrjsonProvider, app, db, response_cache
+
+    providers = {"default": DefaultJSONProvider(app)}
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        print("orjson not installed; timing the default provider only", file=sys.stderr)
+    else:
+        providers["orjson"] = OrjsonProvider(app)
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    results = {
+        "meta": {"designs": args.designs, "orders": args.orders, "repeat": args.repeat},
+        "results": {},
+    }
+    with app.app_context():
+        print(f"Seeding {args.designs} designs and {args.orders} orders...", file=sys.stderr)
+        synthetic.seed(args.designs, args.orders, categories=50)
+        client = app.test_client()
+        for label, url in (("designs", "/api/designs"), ("orders", "/api/orders")):
+            # Reuse the app's own view output as the payload to encode
+            app.json = providers["default"]
+            payload = json.loads(client.get(url, headers={"Accept-Encoding": "identity"}).data)
+            body = providers["default"].dumps(payload, separators=(",", ":")).encode()
+            entry = {
+                "items": len(payload),
+                "bytes": {"identity": len(body), "gzip": len(gzip.compress(body, 6))},
+                "encode_ms": {},
+                "compress_ms": {"gzip": best_of(lambda: gzip.compress(body, 6), args.repeat)},
+            }
+            if brotli is not None:
+                entry["bytes"]["br"] = len(brotli.compress(body, quality=5))
+                entry["compress_ms"]["br"] = best_of(
+                    lambda: brotli.compress(body, quality=5), args.repeat
+                )
+            for name, provider in providers.items():
+                with app.test_request_context():
+                    entry["encode_ms"][name] = best_of(
+                        lambda: provider.response(payload), args.repeat
+                    )
+                app.json = provider
+
+                def uncached_get():
+                    # /api/designs is a cached view; time the full render every run
+                    response_cache.clear()
+                    client.get(url, headers={"Accept-Encoding": "gzip"})
+
+                entry.setdefault("request_ms", {})[name] = best_of(uncached_get, args.repeat)
+            results["results"][label] = entry
+            print(f"{url}: {entry['items']} items")
+            print(f"  bytes       {entry['bytes']}")
+            print(f"  encode ms   {entry['encode_ms']}")
+            print(f"  compress ms {entry['compress_ms']}")
+            print(f"  request ms  {entry['request_ms']} (gzip)")
+        db.session.remove()
+        db.engine.dispose()
+    tmpdir.cleanup()
+
+    with open(args.output, "w") as fh:
+        json.dump(results, fh, indent=2)
+    print(f"Wrote {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
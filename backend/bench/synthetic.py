@@ -0,0 +1,159 @@
+"""Synthetic catalog and order history for benchmarks and query-plan checks.
+
+Import this only after DATABASE_URL points at a scratch database; ``seed``
+refuses to write into a database that already holds designs.
+"""
+
+import random
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy import insert, text
+
+import app as backend
+from app import (
+    MAIN_CATEGORIES,
+    Category,
+    CustomOrder,
+    Design,
+    DesignSearchTerm,
+    Order,
+    OrderItem,
+    db,
+    search_terms_for,
+)
+
+WORDS = (
+    "star night galaxy sunset ocean mountain city neon retro vintage dragon "
+    "samurai forest river tiger lion wolf eagle storm rain desert dream "
+    "minimal abstract poster classic legend hero quote cosmic urban jazz"
+).split()
+POSTER_SIZES = [
+    ("PVC Poster", "12x18", None),
+    ("Sticker Poster", "24x18", None),
+    ("PVC Board Poster", "12x18", "3mm"),
+]
+STATUSES = ["pending", "confirmed", "processing", "delivered", "cancelled"]
+CHUNK = 5000
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(insert(model), rows[start:start + CHUNK])
+
+
+def seed(designs=20000, orders=50000, categories=200, seed_value=42):
+    """Create tables and fill them with a reproducible synthetic dataset.
+
+    Returns a dict of handy sample values (a category id, a customer email, a
+    design image key, ...) for building requests against the data.
+    """
+    rng = random.Random(seed_value)
+    backend.init_db()
+    if db.session.query(Design.id).first():
+        raise RuntimeError("Refusing to seed: the target database already has designs")
+
+    now = datetime.utcnow()
+    category_rows = [
+        {
+            "id": i + 1,
+            "main_category": MAIN_CATEGORIES[i % len(MAIN_CATEGORIES)],
+            "name": f"{rng.choice(WORDS).title()} {i}",
+            "created_at": now,
+        }
+        for i in range(categories)
+    ]
+    _insert(Category, category_rows)
+    by_id = {r["id"]: SimpleNamespace(**r) for r in category_rows}
+
+    design_rows = []
+    term_rows = []
+    for i in range(1, designs + 1):
+        poster_type, size, thickness = rng.choice(POSTER_SIZES)
+        row = {
+            "id": i,
+            "category_id": rng.randint(1, categories),
+            "title": " ".join(rng.sample(WORDS, 3)).title() + f" {i}",
+            "image_filename": f"designs/{uuid.UUID(int=rng.getrandbits(128)).hex}.jpg",
+            "poster_type": poster_type,
+            "size": size,
+            "thickness": thickness,
+            "featured": rng.random() < 0.05,
+            "hidden": rng.random() < 0.05,
+            "created_at": now - timedelta(minutes=i),
+        }
+        design_rows.append(row)
+        terms = search_terms_for(SimpleNamespace(**row), by_id[row["category_id"]])
+        term_rows += [{"design_id": i, "term": t, "weight": w} for t, w in terms.items()]
+    _insert(Design, design_rows)
+    _insert(DesignSearchTerm, term_rows)
+
+    emails = [f"customer{i}@example.com" for i in range(max(orders // 5, 1))]
+    order_rows = []
+    item_rows = []
+    for i in range(1, orders + 1):
+        created = now - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60))
+        quantity = rng.randint(1, 3)
+        design = design_rows[rng.randrange(len(design_rows))] if design_rows else None
+        order_rows.append(
+            {
+                "id": i,
+                "order_code": f"{created:%y}{i:06d}",
+                "name": "Customer",
+                "email": rng.choice(emails),
+                "phone": "+8801700000000",
+                "address": "House 1, Road 2",
+                "city": rng.choice(["Dhaka", "Chattogram", "Sylhet"]),
+                "postal_code": "1205",
+                "payment_method": "cod",
+                "status": rng.choice(STATUSES),
+                "items": "[]",
+                "total_price": 55.0 * quantity,
+                "created_at": created,
+            }
+        )
+        item_rows.append(
+            {
+                "order_id": i,
+                "position": 0,
+                "design_id": design["id"] if design else None,
+                "title": design["title"] if design else "Custom#01",
+                "image": design["image_filename"] if design else None,
+                "poster_type": "PVC Poster",
+                "size": "12x18",
+                "price": 55.0,
+                "quantity": quantity,
+            }
+        )
+    _insert(Order, order_rows)
+    _insert(OrderItem, item_rows)
+
+    custom_rows = [
+        {
+            "order_code": f"{i:08x}",
+            "poster_type": "PVC Poster",
+            "size": "12x18",
+            "thickness": "",
+            "file_path": None,
+            "status": "submitted",
+            "created_at": now - timedelta(minutes=rng.randint(0, 365 * 24 * 60)),
+        }
+        for i in range(1, max(orders // 10, 1) + 1)
+    ]
+    _insert(CustomOrder, custom_rows)
+    db.session.commit()
+
+    with db.engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    sample_design = design_rows[len(design_rows) // 2] if design_rows else None
+    return {
+        "category_id": categories // 2 or 1,
+        "main_category": MAIN_CATEGORIES[0],
+        "email": emails[0],
+        "design_id": sample_design["id"] if sample_design else None,
+        "image_key": sample_design["image_filename"] if sample_design else None,
+        "search": sample_design["title"].split()[0][:4] if sample_design else "star",
+        "custom_order_code": custom_rows[0]["order_code"],
+    }
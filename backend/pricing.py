@@ -0,0 +1,164 @@
+"""Server-side price table and cart pricing for quotes and checkout.
+
+Mirrors ``frontend/src/utils/priceList.js``, which the product pages still
+use to show prices; keep the two in sync when prices change. The cart and
+checkout pages get their totals from ``/api/quote``. ``tests/test_pricing.py``
+checks both the price table and the discount rules the browser applied before.
+"""
+
+# poster type -> thickness -> size -> price, or poster type -> size -> price
+PRICE_LIST = {
+    "PVC Board Poster": {
+        "3mm": {
+            "6x8": 70,
+            "12x8": 130,
+            "12x18": 299,
+            "24x18": 600,
+            "18x30": 780,
+            "36x24": 1099,
+        },
+        "5mm": {
+            "6x8": 80,
+            "12x8": 180,
+            "12x18": 399,
+            "24x18": 760,
+            "18x30": 900,
+            "36x24": 1299,
+        },
+    },
+    "Sticker Poster": {
+        "12x18": 135,
+        "24x18": 270,
+        "18x30": 340,
+        "36x24": 540,
+        "24x48": 720,
+        "48x30": 900,
+        "36x48": 1100,
+        "36x60": 1350,
+        "48x60": 1800,
+    },
+    "PVC Poster": {
+        "12x18": 55,
+        "24x18": 110,
+        "18x30": 140,
+        "36x24": 220,
+        "24x48": 300,
+        "48x30": 400,
+        "36x48": 450,
+        "36x60": 550,
+        "48x60": 750,
+    },
+}
+
+DELIVERY_CHARGES = {"dhaka": 70}
+DEFAULT_DELIVERY_CHARGE = 120
+
+
+class PricingError(ValueError):
+    """Raised for cart items that cannot be priced."""
+
+
+def unit_price(poster_type, size, thickness=None):
+    sizes = PRICE_LIST.get(poster_type)
+    if sizes is None:
+        raise PricingError(f"Unknown poster type: {poster_type}")
+    if size not in sizes:
+        # Types priced per thickness nest one level deeper
+        sizes = sizes.get(thickness) if thickness else None
+        if not isinstance(sizes, dict):
+            raise PricingError(f"Unknown thickness for {poster_type}: {thickness}")
+    if size not in sizes:
+        raise PricingError(f"Unknown size for {poster_type}: {size}")
+    return float(sizes[size])
+
+
+def delivery_charge(city):
+    city = (city or "").strip().lower()
+    if not city:
+        return 0.0
+    return float(DELIVERY_CHARGES.get(city, DEFAULT_DELIVERY_CHARGE))
+
+
+def best_discount(base, percent, amount):
+    """The larger of a percentage of ``base`` and a flat amount."""
+    by_percent = base * percent / 100 if percent else 0
+    return max(by_percent, amount or 0)
+
+
+class DiscountIndex:
+    """Lookup tables for poster discounts and promo codes.
+
+    Built from rows with ``poster_type``/``size``/``percent``/``amount`` and
+    ``code``/``percent``/``amount`` attributes. When several discounts share a
+    poster type and size the first one wins, as on the storefront.
+    """
+
+    def __init__(self, poster_discounts, promo_codes):
+        self.poster = {}
+        for d in poster_discounts:
+            self.poster.setdefault(
+                (d.poster_type, d.size), (float(d.percent or 0), float(d.amount or 0))
+            )
+        self.promo = {
+            p.code.lower(): {
+                "code": p.code,
+                "percent": float(p.percent or 0),
+                "amount": float(p.amount or 0),
+            }
+            for p in promo_codes
+        }
+
+    def poster_discount(self, poster_type, size, price):
+        match = self.poster.get((poster_type, size))
+        return best_discount(price, *match) if match else 0.0
+
+    def promo_code(self, code):
+        return self.promo.get((code or "").strip().lower())
+
+
+def quote_cart(items, index, promo_code=None, city=None):
+    """Price ``items`` (cart item dicts) with ``index``; return a quote dict.
+
+    Raises ``PricingError`` if an item's type, thickness or size is unknown
+    or its quantity is not a positive integer.
+    """
+    lines = []
+    subtotal = 0.0
+    item_discount = 0.0
+    for item in items:
+        poster_type = item.get("type") or item.get("posterType")
+        quantity = item.get("quantity", item.get("qty", 1))
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+            raise PricingError(f"Invalid quantity: {quantity}")
+        price = unit_price(poster_type, item.get("size"), item.get("thickness"))
+        discount = index.poster_discount(poster_type, item.get("size"), price)
+        subtotal += price * quantity
+        item_discount += discount * quantity
+        lines.append(
+            {
+                "type": poster_type,
+                "size": item.get("size"),
+                "thickness": item.get("thickness") or None,
+                "quantity": quantity,
+                "unit_price": price,
+                "unit_discount": round(discount, 2),
+                "line_total": round((price - discount) * quantity, 2),
+            }
+        )
+
+    discounted = subtotal - item_discount
+    promo = index.promo_code(promo_code) if promo_code else None
+    promo_discount = best_discount(discounted, promo["percent"], promo["amount"]) if promo else 0.0
+    delivery = delivery_charge(city)
+    quote = {
+        "items": lines,
+        "subtotal": round(subtotal, 2),
+        "item_discount": round(item_discount, 2),
+        "promo": promo,
+        "promo_discount": round(promo_discount, 2),
+        "delivery_charge": delivery,
+        "total": round(discounted + delivery - promo_discount, 2),
+    }
+    if promo_code and not promo:
+        quote["promo_error"] = "Invalid code"
+    return quote
@@ -0,0 +1,71 @@
+"""Shared fixtures: the app on a scratch SQLite database.
+
+The environment is set before ``app`` is imported. Background storage-job
+workers and rate limiting are off so tests drive them explicitly.
+"""
+
+import os
+import tempfile
+
+import pytest
+
+_tmpdir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir.name}/test.db"
+os.environ["RATE_LIMIT_ENABLED"] = "0"
+os.environ["STORAGE_JOB_WORKER"] = "0"
+os.environ.update(
+    WASABI_KEY="test",
+    WASABI_SECRET="test",
+    WASABI_BUCKET="test",
+    WASABI_REGION="us-east-1",
+    WASABI_ENDPOINT="https://s3.us-east-1.amazonaws.com",
+)
+
+import app as appmod  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    """A freshly initialized database inside an app context."""
+    with appmod.app.app_context():
+        appmod.db.drop_all()
+        appmod.init_db()
+        appmod.response_cache.clear()
+        yield appmod
+        appmod.db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.app.test_client()
+
+
+@pytest.fixture
+def s3(app):
+    """moto's in-process S3 with the app's bucket created."""
+    moto = pytest.importorskip("moto")
+    with moto.mock_aws():
+        app.get_s3().create_bucket(Bucket=app.BUCKET)
+        yield app.get_s3()
+
+
+@pytest.fixture
+def make_design(app):
+    """Insert a visible design directly, without uploading an image."""
+
+    def make(title="Poster", category=None, **fields):
+        if category is None:
+            category = app.Category(name=f"Category {title}", main_category="Movies")
+            app.db.session.add(category)
+            app.db.session.flush()
+        design = app.Design(
+            category_id=category.id,
+            title=title,
+            image_filename=f"designs/{title.lower().replace(' ', '-')}.jpg",
+            **fields,
+        )
+        app.db.session.add(design)
+        app.db.session.commit()
+        return design
+
+    return make
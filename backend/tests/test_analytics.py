@@ -0,0 +1,83 @@
+"""Incremental sales rollups must always equal a rebuild from the orders."""
+
+import pytest
+
+
+def rollups(app):
+    # Incremental updates can leave zeroed rows behind; a rebuild never writes them
+    sales = sorted(
+        (r.day, r.status, r.orders, round(r.revenue, 2))
+        for r in app.SalesDaily.query
+        if r.orders or r.revenue
+    )
+    designs = sorted(
+        (r.day, r.design_id, r.orders, r.quantity)
+        for r in app.DesignSalesDaily.query
+        if r.orders or r.quantity
+    )
+    return sales, designs
+
+
+def assert_matches_rebuild(app):
+    incremental = rollups(app)
+    app.rebuild_sales_rollups()
+    app.db.session.commit()
+    assert rollups(app) == incremental
+
+
+def place_order(client, *design_ids, quantity=2):
+    items = [
+        {"designId": d, "type": "PVC Poster", "size": "12x18", "quantity": quantity}
+        for d in design_ids
+    ]
+    response = client.post(
+        "/api/orders",
+        json={"name": "A", "phone": "1", "address": "x", "city": "Dhaka", "items": items},
+    )
+    assert response.status_code == 201, response.json
+    with client.application.app_context():
+        from app import Order
+
+        return Order.query.order_by(Order.id.desc()).first().id
+
+
+@pytest.mark.parametrize("status", ["cancelled", "delivered"])
+def test_rollups_survive_design_delete_then_status_change(app, client, make_design, status):
+    kept, deleted = make_design("Kept"), make_design("Deleted")
+    kept_id, deleted_id = kept.id, deleted.id
+    first = place_order(client, kept_id, deleted_id)
+    second = place_order(client, deleted_id, deleted_id, quantity=3)
+
+    assert client.delete(f"/api/designs/{deleted_id}").status_code == 200
+    assert client.patch(f"/api/orders/{first}", json={"status": status}).status_code == 200
+    assert client.patch(f"/api/orders/{second}", json={"status": "cancelled"}).status_code == 200
+    assert client.patch(f"/api/orders/{second}", json={"status": "pending"}).status_code == 200
+    assert_matches_rebuild(app)
+
+    _, designs = rollups(app)
+    assert deleted_id in {design_id for _, design_id, _, _ in designs}
+
+
+def test_rebuild_counts_an_order_once_per_design(app, client, make_design):
+    a, b = make_design("A"), make_design("B")
+    place_order(client, a.id, b.id, a.id)
+    assert_matches_rebuild(app)
+    _, designs = rollups(app)
+    assert [(d, n, q) for _, d, n, q in designs] == [(a.id, 1, 4), (b.id, 1, 2)]
+
+
+
+@pytest.mark.parametrize(
+    "query, error",
+    [
+        ("period=year", "period must be one of: day, week, month"),
+        ("top=abc", "top must be an integer 0-50"),
+        ("top=51", "top must be an integer 0-50"),
+        ("start=yesterday", "start and end must be YYYY-MM-DD dates"),
+        ("start=2026-02-01&end=2026-01-01", "start must not be after end"),
+    ],
+)
+def test_analytics_rejects_bad_arguments(client, query, error):
+    response = client.get(f"/api/analytics?{query}")
+    assert response.status_code == 400
+    assert response.json["error"] == error
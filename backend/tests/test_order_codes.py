@@ -0,0 +1,70 @@
+"""Order codes come from a per-year counter and are never handed out twice."""
+
+import threading
+from datetime import datetime
+
+import pytest
+
+
+@pytest.fixture
+def year():
+    return datetime.utcnow().strftime("%y")
+
+
+def test_codes_are_sequential_per_year(app, year):
+    codes = [app.generate_order_code() for _ in range(3)]
+    app.db.session.commit()
+    assert codes == [f"{year}0001", f"{year}0002", f"{year}0003"]
+
+
+def test_first_code_continues_after_existing_orders(app, year):
+    app.db.session.add(
+        app.Order(
+            order_code=f"{year}0042", name="A", phone="1", address="x", city="y", total_price=0
+        )
+    )
+    app.db.session.commit()
+    assert app.generate_order_code() == f"{year}0043"
+
+
+def test_rolled_back_order_releases_its_code(app, year):
+    assert app.generate_order_code() == f"{year}0001"
+    app.db.session.rollback()
+    assert app.generate_order_code() == f"{year}0001"
+
+
+def test_code_grows_a_digit_past_9999(app, year):
+    app.db.session.add(app.OrderCodeCounter(year=year, value=9999))
+    app.db.session.commit()
+    assert app.generate_order_code() == f"{year}10000"
+
+
+def test_concurrent_checkouts_get_distinct_codes(app, client):
+    order = {
+        "name": "A",
+        "phone": "1",
+        "address": "x",
+        "city": "Dhaka",
+        "items": [{"type": "PVC Poster", "size": "12x18", "quantity": 1}],
+    }
+    codes = []
+    failures = []
+    lock = threading.Lock()
+
+    def checkout():
+        local = app.app.test_client()
+        for _ in range(5):
+            response = local.post("/api/orders", json=order)
+            with lock:
+                if response.status_code == 201:
+                    codes.append(response.json["order_id"])
+                else:
+                    failures.append(response.status_code)
+
+    threads = [threading.Thread(target=checkout) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert failures == []
+    assert len(codes) == len(set(codes)) == 30
@@ -0,0 +1,103 @@
+"""Keyset pagination of /api/designs and /api/orders."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def collect(client, url, limit, **args):
+    """Follow ``next_cursor`` from ``url``; return the items and page count."""
+    items, pages = [], 0
+    cursor = None
+    while True:
+        query = {"limit": limit, **args}
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get(url, query_string=query)
+        assert response.status_code == 200
+        pages += 1
+        items += response.json["items"]
+        cursor = response.json["next_cursor"]
+        if cursor is None:
+            return items, pages
+
+
+@pytest.fixture
+def orders(app):
+    """Seven orders, with three sharing one created_at to exercise the id tiebreak."""
+    start = datetime(2024, 5, 1, 12, 0)
+    stamps = [start, start, start] + [start + timedelta(hours=h) for h in (1, 2, 3, 4)]
+    rows = [
+        app.Order(
+            order_code=f"PS-{i:04d}",
+            name="Ada",
+            email="ada@example.com" if i % 2 else "bob@example.com",
+            phone="0123",
+            address="1 Main St",
+            city="Dhaka",
+            created_at=stamp,
+        )
+        for i, stamp in enumerate(stamps)
+    ]
+    app.db.session.add_all(rows)
+    app.db.session.commit()
+    return rows
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 100])
+def test_designs_pages_cover_every_row_once(client, make_design, limit):
+    ids = [make_design(f"Poster {i}").id for i in range(7)]
+    items, pages = collect(client, "/api/designs", limit)
+    assert [d["id"] for d in items] == ids
+    assert pages == max(1, -(-len(ids) // limit))
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 100])
+def test_orders_pages_cover_every_row_once(client, orders, limit):
+    items, _ = collect(client, "/api/orders", limit)
+    expected = sorted(orders, key=lambda o: (o.created_at, o.id), reverse=True)
+    assert [o["id"] for o in items] == [o.id for o in expected]
+
+
+def test_orders_pages_respect_the_email_filter(client, orders):
+    items, _ = collect(client, "/api/orders", 1, email="ada@example.com")
+    assert {o["email"] for o in items} == {"ada@example.com"}
+    assert len(items) == sum(o.email == "ada@example.com" for o in orders)
+
+
+def test_unpaged_requests_keep_the_plain_list(client, make_design):
+    make_design("Alien")
+    assert isinstance(client.get("/api/designs").json, list)
+
+
+def test_limit_is_capped(app, client, make_design):
+    for i in range(app.MAX_PAGE_SIZE + 1):
+        make_design(f"Poster {i}")
+    response = client.get("/api/designs?limit=1000")
+    assert len(response.json["items"]) == app.MAX_PAGE_SIZE
+    assert response.json["next_cursor"]
+
+
+@pytest.mark.parametrize("url", ["/api/designs", "/api/orders"])
+@pytest.mark.parametrize("limit", ["0", "-1", "ten"])
+def test_invalid_limit(client, url, limit):
+    response = client.get(url, query_string={"limit": limit})
+    assert response.status_code == 400
+    assert response.json == {"error": "Invalid limit"}
+
+
+@pytest.mark.parametrize("url", ["/api/designs", "/api/orders"])
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        "bm90IGpzb24",  # "not json"
+        "WzFd",  # [1]
+        "eyJpZCI6ICJ4In0",  # {"id": "x"}
+        "e30",  # {}
+    ],
+)
+def test_invalid_cursor(client, url, cursor):
+    response = client.get(url, query_string={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json == {"error": "Invalid cursor"}
@@ -0,0 +1,151 @@
+"""pricing.quote_cart must agree with the storefront's original JS formulas."""
+
+import json
+import os
+import re
+from types import SimpleNamespace
+
+import pytest
+
+import pricing
+
+PRICE_LIST_JS = os.path.join(
+    os.path.dirname(__file__), "..", "..", "frontend", "src", "utils", "priceList.js"
+)
+
+
+def discount(poster_type, size, percent=0, amount=0):
+    return SimpleNamespace(poster_type=poster_type, size=size, percent=percent, amount=amount)
+
+
+def promo(code, percent=0, amount=0):
+    return SimpleNamespace(code=code, percent=percent, amount=amount)
+
+
+def js_checkout_total(items, poster_discounts, promo_code, city):
+    """Port of the totals Checkout.js computed in the browser before /api/quote."""
+    raw_subtotal = sum(i["price"] * i["quantity"] for i in items)
+    item_discount = 0
+    for item in items:
+        match = next(
+            (d for d in poster_discounts if d.poster_type == item["type"] and d.size == item["size"]),
+            None,
+        )
+        if not match:
+            continue
+        percent = item["price"] * match.percent / 100 if match.percent else 0
+        amount = match.amount or 0
+        item_discount += (percent if percent > amount else amount) * item["quantity"]
+    subtotal = raw_subtotal - item_discount
+    promo_discount = max(subtotal * (promo_code.percent / 100), promo_code.amount) if promo_code else 0
+    normalized_city = city.strip().lower()
+    delivery = 0 if normalized_city == "" else 70 if normalized_city == "dhaka" else 120
+    return round(subtotal + delivery - promo_discount, 2)
+
+
+def item(poster_type, size, quantity=1, thickness=""):
+    """A cart item as the storefront stored it: ``price`` is unit price times quantity."""
+    price = pricing.unit_price(poster_type, size, thickness) * quantity
+    return {"type": poster_type, "size": size, "thickness": thickness, "price": price, "quantity": quantity}
+
+
+def per_unit(cart):
+    """``cart`` with ``price`` as the unit price, the shape the JS formulas assumed."""
+    return [dict(i, price=i["price"] / i["quantity"]) for i in cart]
+
+
+DISCOUNTS = [
+    discount("PVC Poster", "12x18", percent=10),
+    discount("PVC Poster", "24x18", amount=15),
+    discount("Sticker Poster", "12x18", percent=10, amount=20),
+    discount("Sticker Poster", "24x18", percent=25, amount=20),
+    discount("PVC Board Poster", "12x18", percent=5),
+]
+PROMOS = [promo("SAVE10", percent=10), promo("FLAT50", amount=50), promo("BEST", percent=5, amount=30)]
+
+CARTS = [
+    [item("PVC Poster", "12x18")],
+    [item("PVC Poster", "12x18", 3), item("PVC Poster", "24x18", 2)],
+    [item("Sticker Poster", "12x18", 2), item("Sticker Poster", "24x18")],
+    [item("PVC Board Poster", "12x18", 1, "3mm"), item("PVC Board Poster", "12x18", 2, "5mm")],
+    [item("PVC Poster", "48x60"), item("Sticker Poster", "36x60", 4)],
+]
+
+
+def test_price_list_matches_frontend():
+    with open(PRICE_LIST_JS) as fh:
+        source = fh.read()
+    body = source.split("=", 1)[1].strip().rstrip(";")
+    body = re.sub(r"\b(size|price):", r'"\1":', body)
+    frontend = json.loads(re.sub(r",(\s*[\]}])", r"\1", body))
+
+    def flatten(entry):
+        if isinstance(entry, list):
+            return {s["size"]: s["price"] for s in entry}
+        return {k: flatten(v) for k, v in entry.items()}
+
+    assert flatten(frontend) == pricing.PRICE_LIST
+
+
+@pytest.mark.parametrize("cart", CARTS)
+@pytest.mark.parametrize("code", [None, "SAVE10", "FLAT50", "BEST"])
+@pytest.mark.parametrize("city", ["", "Dhaka", " dhaka ", "Chittagong"])
+def test_quote_matches_checkout_formula_per_unit(cart, code, city):
+    index = pricing.DiscountIndex(DISCOUNTS, PROMOS)
+    applied = next((p for p in PROMOS if p.code == code), None)
+    quote = pricing.quote_cart(cart, index, code, city)
+    expected = js_checkout_total(per_unit(cart), DISCOUNTS, applied, city)
+    assert quote["total"] == pytest.approx(expected)
+
+
+def test_quote_ignores_client_price():
+    cart = [item("PVC Poster", "12x18", 3)]
+    cheap = [dict(cart[0], price=1)]
+    index = pricing.DiscountIndex([], [])
+    assert pricing.quote_cart(cart, index)["total"] == pricing.quote_cart(cheap, index)["total"]
+
+
+def test_quantity_is_charged_once():
+    # The storefront stored price = unit * qty and Checkout.js multiplied by qty
+    # again, so three 55 BDT posters came to 495. The server charges 165.
+    cart = [item("PVC Poster", "12x18", 3)]
+    index = pricing.DiscountIndex([], [])
+    assert pricing.quote_cart(cart, index, city="Dhaka")["total"] == 55 * 3 + 70
+    assert js_checkout_total(cart, [], None, "Dhaka") == 55 * 3 * 3 + 70
+
+
+def test_first_matching_poster_discount_wins():
+    index = pricing.DiscountIndex(
+        [discount("PVC Poster", "12x18", amount=5), discount("PVC Poster", "12x18", amount=50)], []
+    )
+    quote = pricing.quote_cart([item("PVC Poster", "12x18")], index)
+    assert quote["item_discount"] == 5
+
+
+def test_promo_codes_are_case_insensitive():
+    index = pricing.DiscountIndex([], PROMOS)
+    quote = pricing.quote_cart([item("PVC Poster", "12x18")], index, " save10 ")
+    assert quote["promo"]["code"] == "SAVE10"
+    assert quote["promo_discount"] == 5.5
+
+
+def test_unknown_promo_code_is_reported():
+    quote = pricing.quote_cart([item("PVC Poster", "12x18")], pricing.DiscountIndex([], PROMOS), "NOPE")
+    assert quote["promo"] is None
+    assert quote["promo_error"] == "Invalid code"
+
+
+@pytest.mark.parametrize(
+    "bad",
+    [
+        {"type": "Canvas", "size": "12x18"},
+        {"type": "PVC Poster", "size": "1x1"},
+        {"type": "PVC Board Poster", "size": "12x18"},
+        {"type": "PVC Board Poster", "size": "12x18", "thickness": "9mm"},
+        {"type": "PVC Poster", "size": "12x18", "quantity": 0},
+        {"type": "PVC Poster", "size": "12x18", "quantity": True},
+    ],
+)
+def test_unpriceable_items_raise(bad):
+    with pytest.raises(pricing.PricingError):
+        pricing.quote_cart([bad], pricing.DiscountIndex([], []))
@@ -0,0 +1,120 @@
+"""Token-bucket rate limiting: rule parsing, both stores and the decorator."""
+
+from types import SimpleNamespace
+
+import pytest
+
+
+class Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(app, monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(app, "time", SimpleNamespace(monotonic=clock, time=clock))
+    return clock
+
+
+@pytest.fixture(params=["local", "redis"])
+def store(request, app, clock):
+    if request.param == "local":
+        return app.LocalRateLimitStore(maxsize=100)
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    return app.RedisRateLimitStore(fakeredis.FakeRedis())
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    [("10/minute", (10 / 60, 10)), ("1/second", (1, 1)), ("24/day", (24 / 86400, 24))],
+)
+def test_parse_rate(app, spec, expected):
+    assert app.parse_rate(spec) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("spec", ["0/minute", "10/fortnight", "ten/minute", "10"])
+def test_parse_rate_rejects_bad_rules(app, spec):
+    with pytest.raises(ValueError):
+        app.parse_rate(spec)
+
+
+def test_burst_then_refill(store, clock):
+    rate, burst = 1 / 6, 3  # 10/minute with a burst of 3
+    assert [store.take("k", rate, burst)[0] for _ in range(3)] == [True] * 3
+    allowed, retry_after = store.take("k", rate, burst)
+    assert not allowed
+    assert retry_after == pytest.approx(6)
+
+    clock.now += 6
+    assert store.take("k", rate, burst) == (True, 0.0)
+    assert not store.take("k", rate, burst)[0]
+
+
+def test_buckets_are_per_key(store):
+    assert store.take("a", 1, 1)[0]
+    assert not store.take("a", 1, 1)[0]
+    assert store.take("b", 1, 1)[0]
+
+
+def test_local_store_evicts_least_recently_used(app, clock):
+    store = app.LocalRateLimitStore(maxsize=2)
+    store.take("a", 1, 1)
+    store.take("b", 1, 1)
+    store.take("c", 1, 1)
+    assert list(store._buckets) == ["b", "c"]
+    # An evicted key starts again with a full bucket
+    assert store.take("a", 1, 1)[0]
+
+
+def test_redis_store_fails_open(app):
+    def unavailable(**kwargs):
+        raise ConnectionError("redis is down")
+
+    client = SimpleNamespace(register_script=lambda script: unavailable)
+    store = app.RedisRateLimitStore(client)
+    assert store.take("k", 1, 1) == (True, 0.0)
+
+
+@pytest.fixture
+def limited(app, monkeypatch):
+    monkeypatch.setattr(app, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(app, "rate_limit_store", app.LocalRateLimitStore(1000))
+
+
+def test_login_is_limited_per_email(client, limited):
+    body = {"email": "someone@example.com", "password": "wrong"}
+    statuses = [client.post("/api/login", json=body).status_code for _ in range(6)]
+    assert statuses == [401] * 5 + [429]
+    # Another email from the same address still gets through
+    other = client.post("/api/login", json={"email": "other@example.com", "password": "x"})
+    assert other.status_code == 401
+
+
+def test_limited_response_has_retry_after(client, limited):
+    for _ in range(5):
+        client.post("/api/register", json={})
+    response = client.post("/api/register", json={})
+    assert response.status_code == 429
+    assert response.json == {"error": "Too many requests"}
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_bad_requests_still_spend_tokens(client, limited):
+    statuses = [client.post("/api/register", json={}).status_code for _ in range(6)]
+    assert statuses == [400] * 5 + [429]
+
+
+def test_only_limited_methods_are_counted(client, limited):
+    for _ in range(10):
+        assert client.get("/api/user?email=nobody@example.com").status_code == 404
+    assert client.patch("/api/user", json={}).status_code == 400
+
+
+def test_disabled_limiter_lets_everything_through(client):
+    statuses = {client.post("/api/register", json={}).status_code for _ in range(10)}
+    assert statuses == {400}
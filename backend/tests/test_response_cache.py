@@ -0,0 +1,108 @@
+"""Generation-keyed response cache: ETags, invalidation and the byte bound."""
+
+import pytest
+
+
+def test_etag_revalidates_until_a_write(client, make_design):
+    design = make_design("Alien")
+    first = client.get("/api/designs")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"designs-')
+
+    unchanged = client.get("/api/designs", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+
+    response = client.put(f"/api/designs/{design.id}", json={"title": "Aliens"})
+    assert response.status_code == 200
+    changed = client.get("/api/designs", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert [d["title"] for d in changed.json] == ["Aliens"]
+
+
+def test_only_a_bump_invalidates(app, client, make_design):
+    make_design("Alien")
+    assert len(client.get("/api/designs").json) == 1
+    make_design("Heat")  # written without bumping
+    assert len(client.get("/api/designs").json) == 1
+
+    # Other families leave designs alone
+    response = client.post(
+        "/api/discounts/posters", json={"poster_type": "Matte", "size": "A4"}
+    )
+    assert response.status_code == 201
+    assert len(client.get("/api/designs").json) == 1
+
+    app.response_cache.bump("designs")
+    app.db.session.commit()
+    assert len(client.get("/api/designs").json) == 2
+
+
+def test_unread_arguments_share_an_entry(app, client, make_design):
+    make_design("Alien")
+    client.get("/api/designs")
+    client.get("/api/designs?utm_source=mail")
+    client.get("/api/designs?_=12345")
+    assert len(app.response_cache._entries) == 1
+    client.get("/api/designs?featured=true")
+    assert len(app.response_cache._entries) == 2
+
+
+def test_errors_are_not_cached(app, client):
+    assert client.get("/api/designs?search=nothing").status_code == 404
+    assert client.get("/api/designs?limit=0").status_code == 400
+    assert not app.response_cache._entries
+
+
+@pytest.fixture
+def small_cache(app, monkeypatch):
+    cache = app.ResponseCache(maxbytes=1 << 20, refresh_interval=60)
+    monkeypatch.setattr(app, "response_cache", cache)
+    return cache
+
+
+def test_cache_evicts_oldest_past_its_byte_bound(app, client, small_cache, make_design):
+    for i in range(5):
+        make_design(f"Poster {i}")
+    urls = [f"/api/designs?category_id={i}" for i in (1, 2, 3)]
+    sizes = []
+    for url in urls:
+        small_cache.clear()
+        client.get(url)
+        (entry,) = small_cache._entries.values()
+        sizes.append(entry.size)
+
+    small_cache.maxbytes = sizes[1] + sizes[2]
+    small_cache.clear()
+    for url in urls:
+        client.get(url)
+    position = app.DESIGN_LIST_ARGS.index("category_id")
+    assert [key[3][position] for key in small_cache._entries] == ["2", "3"]
+    assert small_cache._bytes == small_cache.maxbytes
+
+
+def test_oversized_responses_are_not_cached(app, client, small_cache, make_design):
+    make_design("Alien")
+    small_cache.maxbytes = 10
+    assert client.get("/api/designs").status_code == 200
+    assert not small_cache._entries
+    assert small_cache._bytes == 0
+
+
+def test_bump_on_an_unseeded_database(app, client, make_design):
+    app.CacheGeneration.query.delete()
+    app.db.session.commit()
+    make_design("Alien")
+    etag = client.get("/api/designs").headers["ETag"]
+    assert etag == 'W/"designs-0"'
+
+    app.response_cache.bump("designs", "designs")
+    app.db.session.commit()
+    assert app.db.session.get(app.CacheGeneration, "designs").value == 1
+    assert client.get("/api/designs", headers={"If-None-Match": etag}).status_code == 200
+
+    app.response_cache.bump("designs")
+    app.db.session.commit()
+    assert app.db.session.get(app.CacheGeneration, "designs").value == 2
+
@@ -0,0 +1,109 @@
+"""Ranked design search over the `design_search_term` index."""
+
+import pytest
+
+
+@pytest.fixture
+def catalog(app, make_design):
+    """Designs that match "space" through different fields."""
+    space = app.Category(name="Space", main_category="Movies")
+    anime = app.Category(name="Mecha", main_category="Anime")
+    app.db.session.add_all([space, anime])
+    app.db.session.flush()
+    designs = {
+        "title": make_design("Space Odyssey", category=anime),
+        "category": make_design("Interstellar", category=space),
+        "both": make_design("Spaceballs", category=space),
+        "none": make_design("Akira", category=anime),
+    }
+    app.rebuild_search_index()
+    app.db.session.commit()
+    return designs
+
+
+def search(client, text, **args):
+    response = client.get("/api/designs", query_string={"search": text, **args})
+    assert response.status_code == 200, response.json
+    return response.json
+
+
+def titles(results):
+    return [d["title"] for d in results]
+
+
+def test_results_rank_by_field_weight(client, catalog):
+    # Each token scores its best field: title (3) beats category (2), ties by id
+    assert titles(search(client, "space")) == ["Space Odyssey", "Spaceballs", "Interstellar"]
+    # Scores add up across tokens
+    assert titles(search(client, "movies space")) == ["Spaceballs", "Interstellar"]
+
+
+def test_tokens_match_by_prefix_and_all_must_match(client, catalog):
+    assert titles(search(client, "SPA ody")) == ["Space Odyssey"]
+    assert titles(search(client, "mecha akira")) == ["Akira"]
+    assert titles(search(client, "anime")) == ["Space Odyssey", "Akira"]
+
+
+def test_a_token_counts_once_per_design(app, client, make_design):
+    make_design("Star Street Stories")
+    make_design("Sunset")
+    app.rebuild_search_index()
+    app.db.session.commit()
+    # "st" matches three title terms of one design, plus "sunset" of none
+    assert titles(search(client, "st")) == ["Star Street Stories"]
+    assert titles(search(client, "s")) == ["Star Street Stories", "Sunset"]
+
+
+def test_no_match_is_a_404(client, catalog):
+    response = client.get("/api/designs?search=zzz")
+    assert response.status_code == 404
+    assert response.json == {"error": "No item found with that name"}
+    response = client.get("/api/designs?search=zzz&limit=10")
+    assert response.status_code == 404
+
+
+def test_unindexable_search_falls_back_to_title_match(client, catalog):
+    assert client.get("/api/designs?search=%25%25").status_code == 200
+
+
+def test_edits_are_reindexed(client, catalog):
+    design = catalog["none"]
+    response = client.put(f"/api/designs/{design.id}", json={"title": "Space Akira"})
+    assert response.status_code == 200
+    assert "Space Akira" in titles(search(client, "space"))
+    assert titles(search(client, "akira")) == ["Space Akira"]
+
+
+def test_ranked_pages_cover_every_match_once(app, client):
+    category = app.Category(name="Posters", main_category="Movies")
+    app.db.session.add(category)
+    app.db.session.flush()
+    for i in range(9):
+        # Titles with the word score 3 + 1, the rest only match the main category
+        title = f"Movie night {i}" if i % 3 == 0 else f"Poster {i}"
+        app.db.session.add(app.Design(category_id=category.id, title=title))
+    app.rebuild_search_index()
+    app.db.session.commit()
+
+    expected = titles(search(client, "movie"))
+    assert len(expected) == 9
+    collected, cursor = [], None
+    while True:
+        args = {"limit": 2}
+        if cursor:
+            args["cursor"] = cursor
+        page = search(client, "movie", **args)
+        collected += titles(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert collected == expected
+    assert collected[:3] == ["Movie night 0", "Movie night 3", "Movie night 6"]
+
+
+def test_ranked_cursor_must_carry_a_score(client, catalog):
+    response = client.get(
+        "/api/designs", query_string={"search": "space", "cursor": "eyJpZCI6MX0"}
+    )  # {"id":1}
+    assert response.status_code == 400
+    assert response.json == {"error": "Invalid cursor"}
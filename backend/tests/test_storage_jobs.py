@@ -0,0 +1,156 @@
+"""The storage_job queue: claiming with a lease, draining, retries and give-up."""
+
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def enqueue_deletes(app, *batches):
+    for keys in batches:
+        app.enqueue_storage_job("delete", keys=list(keys))
+    app.db.session.commit()
+
+
+def put(s3, app, *keys):
+    for key in keys:
+        s3.put_object(Bucket=app.BUCKET, Key=key, Body=b"x")
+
+
+def bucket_keys(s3, app):
+    return sorted(o["Key"] for o in s3.list_objects_v2(Bucket=app.BUCKET).get("Contents", []))
+
+
+def test_claim_leases_due_jobs_once(app):
+    enqueue_deletes(app, ["a"], ["b"], ["c"])
+    first = app.claim_storage_jobs(2)
+    assert [json.loads(j.payload)["keys"] for j in first] == [["a"], ["b"]]
+    assert all(j.attempts == 1 and j.locked_by for j in first)
+    assert all(j.run_after > datetime.utcnow() for j in first)
+
+    second = app.claim_storage_jobs(2)
+    assert [json.loads(j.payload)["keys"] for j in second] == [["c"]]
+    assert app.claim_storage_jobs(2) == []
+
+
+def test_expired_lease_is_claimed_again(app):
+    enqueue_deletes(app, ["a"])
+    (job,) = app.claim_storage_jobs(1)
+    job.run_after = datetime.utcnow() - timedelta(seconds=1)
+    app.db.session.commit()
+    (again,) = app.claim_storage_jobs(1)
+    assert again.id == job.id
+    assert again.attempts == 2
+
+
+def test_concurrent_claimers_split_the_jobs(app):
+    enqueue_deletes(app, *([f"k{i}"] for i in range(20)))
+    claimed = []
+    lock = threading.Lock()
+
+    def claim():
+        with app.app.app_context():
+            ids = [j.id for j in app.claim_storage_jobs(5)]
+            app.db.session.remove()
+        with lock:
+            claimed.extend(ids)
+
+    threads = [threading.Thread(target=claim) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(claimed) == len(set(claimed))
+    app.db.session.expire_all()
+    locked = app.StorageJob.query.filter(app.StorageJob.locked_by.isnot(None)).count()
+    assert locked == len(claimed)
+
+
+def test_drain_deletes_objects_and_jobs(app, s3):
+    put(s3, app, "designs/a.jpg", "designs/b.jpg", "designs/keep.jpg")
+    enqueue_deletes(app, ["designs/a.jpg"], ["designs/b.jpg", "designs/missing.jpg"])
+    assert app.drain_storage_jobs() == 2
+    assert bucket_keys(s3, app) == ["designs/keep.jpg"]
+    assert app.StorageJob.query.count() == 0
+
+
+def test_failed_keys_are_retried_with_backoff(app, monkeypatch):
+    enqueue_deletes(app, ["designs/a.jpg", "designs/b.jpg"])
+    monkeypatch.setattr(
+        app, "delete_s3_objects", lambda keys: [{"key": "designs/b.jpg", "error": "SlowDown"}]
+    )
+    before = datetime.utcnow()
+    assert app.drain_storage_jobs() == 1
+
+    job = app.StorageJob.query.one()
+    assert job.status == "pending"
+    assert job.locked_by is None
+    assert json.loads(job.payload) == {"keys": ["designs/b.jpg"]}
+    assert job.last_error == "designs/b.jpg: SlowDown"
+    assert job.run_after >= before + timedelta(seconds=app.STORAGE_JOB_BACKOFF)
+    # Not due again until the backoff passes
+    assert app.claim_storage_jobs(10) == []
+
+
+def test_job_fails_for_good_after_max_attempts(app, s3):
+    app.enqueue_storage_job("copy", source="designs/nope.jpg", dest="designs/copy.jpg")
+    app.db.session.commit()
+    job = app.StorageJob.query.one()
+    job.attempts = app.STORAGE_JOB_MAX_ATTEMPTS - 1
+    app.db.session.commit()
+
+    app.drain_storage_jobs()
+    job = app.StorageJob.query.one()
+    assert job.status == "failed"
+    assert job.attempts == app.STORAGE_JOB_MAX_ATTEMPTS
+    assert app.claim_storage_jobs(10) == []
+
+
+def test_unknown_action_is_an_error(app):
+    app.enqueue_storage_job("rename", key="x")
+    app.db.session.commit()
+    jobs = app.claim_storage_jobs(1)
+    errors, remaining = app.run_storage_jobs(jobs)
+    assert errors == {jobs[0].id: "Unknown action: rename"}
+    assert remaining == {}
+
+
+def test_cli_requeues_failed_jobs(app, s3):
+    put(s3, app, "designs/a.jpg")
+    app.db.session.add(
+        app.StorageJob(
+            action="delete",
+            payload=json.dumps({"keys": ["designs/a.jpg"]}),
+            status="failed",
+            attempts=app.STORAGE_JOB_MAX_ATTEMPTS,
+        )
+    )
+    app.db.session.commit()
+    result = app.app.test_cli_runner().invoke(args=["run-storage-jobs", "--retry-failed"])
+    assert result.exit_code == 0
+    assert "Requeued 1 failed jobs" in result.output
+    assert "0 pending, 0 failed" in result.output
+    assert bucket_keys(s3, app) == []
+
+
+def test_design_delete_queues_its_objects(app, client, make_design):
+    design = make_design("Gone", image_variants=None)
+    response = client.delete(f"/api/designs/{design.id}")
+    assert response.status_code == 200
+    (job,) = app.StorageJob.query.all()
+    assert json.loads(job.payload)["keys"] == ["designs/gone.jpg"]
+
+
+@pytest.mark.parametrize(
+    "body, error",
+    [
+        ({"ids": "1,2"}, "ids must be a list of design ids"),
+        ({"ids": [1, True]}, "ids must be a list of design ids"),
+        ({}, "Missing fields: ids or category_id"),
+    ],
+)
+def test_bulk_delete_rejects_bad_input(client, body, error):
+    response = client.delete("/api/designs/bulk", json=body)
+    assert response.status_code == 400
+    assert response.json["error"] == error
@@ -1,18 +1,22 @@
 # WSGI entrypoint for Gunicorn.
-# Ensure your Flask instance is named `app` inside backend/app.py and that the
-# database is initialized when the server starts. This mirrors the `init_db()`
-# call used when running the app directly (see `app.py`). Without this, new
-# tables like `PromoCode` would not be created in environments where the module
-# is loaded via Gunicorn, leading to runtime errors.
+# Ensure your Flask instance is named `app` inside backend/app.py.
+#
+# Workers do no schema work at import time: run `flask --app app init-db`
+# once per deploy (before starting Gunicorn) to create/patch tables and seed
+# the admin user. Set INIT_DB_ON_START=1 to fall back to initializing from the
+# worker itself; the schema lock keeps concurrent workers from racing the DDL.
+
+import os
 
 try:
     # Standard import when `app` is defined at module level
-    from app import app, init_db
+    from app import app, init_db, schema_lock
 except ImportError:
     # Fallback: use factory function pattern
-    from app import create_app, init_db
+    from app import create_app, init_db, schema_lock
     app = create_app()
 
-# Run database initialization on startup
-with app.app_context():
-    init_db()
+if os.environ.get("INIT_DB_ON_START") == "1":
+    with app.app_context():
+        with schema_lock():
+            init_db()
@@ -11,29 +11,13 @@ import {
 import { Link as RouterLink } from 'react-router-dom';
 import InfoOutlinedIcon from '@mui/icons-material/InfoOutlined';
 import { validateCart } from '../utils/validation';
-import { useDiscounts } from '../context/DiscountContext';
+import { useQuote } from '../utils/quote';
 
 const CartSummary = ({ cartItems = [] }) => {
-  const { posterDiscounts } = useDiscounts();
-
-  const subtotal = cartItems.reduce(
-    (sum, item) => sum + (item.price || 0) * item.quantity,
-    0
-  );
-
-  const itemDiscount = cartItems.reduce((sum, item) => {
-    const match = posterDiscounts.find(
-      (d) => d.posterType === item.type && d.size === item.size
-    );
-    if (!match) return sum;
-    const percent = match.percent ? ((item.price || 0) * match.percent) / 100 : 0;
-    const amount = match.amount || 0;
-    const perItem = percent > amount ? percent : amount;
-    return sum + perItem * item.quantity;
-  }, 0);
-
-  const discount = Number(itemDiscount.toFixed(2));
-  const total = Number((subtotal - discount).toFixed(2));
+  const { quote, error } = useQuote(cartItems);
+  const subtotal = quote ? quote.subtotal : 0;
+  const discount = quote ? quote.item_discount : 0;
+  const total = quote ? quote.total : 0;
   const { isValid, message } = validateCart(cartItems);
 
   return (
@@ -77,9 +61,9 @@ const CartSummary = ({ cartItems = [] }) => {
         </Typography>
       </Stack>
 
-      {!isValid && (
+      {(!isValid || error) && (
         <Typography color="error" sx={{ mt: 2 }}>
-          {message}
+          {isValid ? error : message}
         </Typography>
       )}
 
@@ -1,4 +1,4 @@
-import React, { createContext, useContext, useEffect, useState } from 'react';
+import React, { createContext, useCallback, useContext, useState } from 'react';
 import API_BASE from '../utils/apiBase';
 
 const DiscountContext = createContext();
@@ -9,18 +9,17 @@ export function DiscountProvider({ children }) {
   const [posterDiscounts, setPosterDiscounts] = useState([]);
   const [promoCodes, setPromoCodes] = useState([]);
 
-  useEffect(() => {
-    const load = async () => {
-      try {
-        const pdRes = await fetch(`${API_BASE}/api/discounts/posters`);
-        if (pdRes.ok) setPosterDiscounts(await pdRes.json());
-        const pcRes = await fetch(`${API_BASE}/api/discounts/promo`);
-        if (pcRes.ok) setPromoCodes(await pcRes.json());
-      } catch (e) {
-        // ignore network errors
-      }
-    };
-    load();
+  // Only the admin discounts page needs the full lists; checkout prices carts
+  // through /api/quote, so nothing is fetched until a page asks for it.
+  const loadDiscounts = useCallback(async () => {
+    try {
+      const pdRes = await fetch(`${API_BASE}/api/discounts/posters`);
+      if (pdRes.ok) setPosterDiscounts(await pdRes.json());
+      const pcRes = await fetch(`${API_BASE}/api/discounts/promo`);
+      if (pcRes.ok) setPromoCodes(await pcRes.json());
+    } catch (e) {
+      // ignore network errors
+    }
   }, []);
 
   const addPosterDiscount = async (discount) => {
@@ -74,6 +73,7 @@ export function DiscountProvider({ children }) {
       value={{
         posterDiscounts,
         promoCodes,
+        loadDiscounts,
         addPosterDiscount,
         removePosterDiscount,
         addPromoCode,
@@ -1,14 +1,24 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import { Navigate, useNavigate } from 'react-router-dom';
 import { Button, Container, Stack, Typography } from '@mui/material';
 import { useAuth } from '../context/AuthContext';
 import { useAdmin } from '../context/AdminContext';
+import { formatCurrency } from '../utils/currency';
 import '../App.css';
+import API_BASE from '../utils/apiBase';
 
 function AdminDashboard() {
   const { user } = useAuth();
   const { categories, designs } = useAdmin();
   const navigate = useNavigate();
+  const [sales, setSales] = useState(null);
+
+  useEffect(() => {
+    fetch(`${API_BASE}/api/analytics?period=day`)
+      .then((res) => (res.ok ? res.json() : null))
+      .then((data) => setSales(data && data.totals))
+      .catch(() => {});
+  }, []);
 
   if (!user || !user.isAdmin) return <Navigate to="/login" replace />;
 
@@ -20,6 +30,11 @@ function AdminDashboard() {
       <Typography variant="body2" sx={{ mb: 3 }}>
         {categories.length} categories • {designs.length} designs
       </Typography>
+      {sales && (
+        <Typography variant="body2" sx={{ mb: 3 }}>
+          Last 30 days: {sales.orders} orders • {formatCurrency(sales.revenue)} revenue
+        </Typography>
+      )}
       <Stack direction="row" spacing={2}>
         <Button variant="contained" onClick={() => navigate('/admin/categories')}>
           Manage Categories
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import {
   Container,
   Typography,
@@ -30,12 +30,17 @@ function AdminDiscounts() {
   const {
     posterDiscounts,
     promoCodes,
+    loadDiscounts,
     addPosterDiscount,
     removePosterDiscount,
     addPromoCode,
     removePromoCode,
   } = useDiscounts();
 
+  useEffect(() => {
+    loadDiscounts();
+  }, [loadDiscounts]);
+
   const [poster, setPoster] = useState({
     posterType: '',
     sizes: [],
@@ -128,9 +128,19 @@ function AdminOrders() {
 
   return (
     <Container sx={{ mt: 4 }}>
-      <Typography variant="h4" gutterBottom>
-        Orders
-      </Typography>
+      <Stack direction="row" justifyContent="space-between" alignItems="center">
+        <Typography variant="h4" gutterBottom>
+          Orders
+        </Typography>
+        <Stack direction="row" spacing={1}>
+          <Button variant="outlined" href={`${API_BASE}/api/orders/export?format=csv`}>
+            Export CSV
+          </Button>
+          <Button variant="outlined" href={`${API_BASE}/api/orders/export?format=ndjson`}>
+            Export NDJSON
+          </Button>
+        </Stack>
+      </Stack>
       <Paper>
         <Table size="small">
           <TableHead>
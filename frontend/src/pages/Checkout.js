@@ -19,12 +19,11 @@ import { useCart } from '../context/CartContext';
 import { useAuth } from '../context/AuthContext';
 import { useNavigate } from 'react-router-dom';
 import API_BASE from '../utils/apiBase';
-import { useDiscounts } from '../context/DiscountContext';
+import { useQuote } from '../utils/quote';
 
 const Checkout = () => {
   const { items, clearCart } = useCart();
   const { user } = useAuth();
-  const { posterDiscounts, promoCodes } = useDiscounts();
   const [form, setForm] = useState({
     name: '',
     email: user?.email || '',
@@ -60,46 +59,20 @@ const Checkout = () => {
     </Fade>
   );
 
-  const rawSubtotal = items.reduce(
-    (sum, item) => sum + (item.price || 0) * item.quantity,
-    0
-  );
-  const itemDiscount = items.reduce((sum, item) => {
-    const match = posterDiscounts.find(
-      (d) => d.posterType === item.type && d.size === item.size
-    );
-    if (!match) return sum;
-    const percent = match.percent ? ((item.price || 0) * match.percent) / 100 : 0;
-    const amount = match.amount || 0;
-    const perItem = percent > amount ? percent : amount;
-    return sum + perItem * item.quantity;
-  }, 0);
-  const subtotal = rawSubtotal - itemDiscount;
   const [promoInput, setPromoInput] = useState('');
-  const [appliedPromo, setAppliedPromo] = useState(null);
-  const [promoError, setPromoError] = useState('');
-  const promoDiscount = appliedPromo
-    ? Math.max(
-        subtotal * (appliedPromo.percent / 100),
-        appliedPromo.amount
-      )
-    : 0;
-  const normalizedCity = form.city.trim().toLowerCase();
-  const deliveryCharge =
-    normalizedCity === '' ? 0 : normalizedCity === 'dhaka' ? 70 : 120;
-  const total = Number((subtotal + deliveryCharge - promoDiscount).toFixed(2));
+  const [appliedPromo, setAppliedPromo] = useState('');
+  const { quote, error: quoteError } = useQuote(items, {
+    promoCode: appliedPromo,
+    city: form.city,
+  });
+  const promoError = appliedPromo && quote?.promo_error;
+  const subtotal = quote ? quote.subtotal - quote.item_discount : 0;
+  const deliveryCharge = quote ? quote.delivery_charge : 0;
+  const promoDiscount = quote ? quote.promo_discount : 0;
+  const total = quote ? quote.total : null;
 
   const handleApply = () => {
-    const found = promoCodes.find(
-      (p) => p.code.toLowerCase() === promoInput.trim().toLowerCase()
-    );
-    if (found) {
-      setAppliedPromo(found);
-      setPromoError('');
-    } else {
-      setAppliedPromo(null);
-      setPromoError('Invalid code');
-    }
+    setAppliedPromo(promoInput.trim());
   };
 
   const handleSubmit = async () => {
@@ -124,7 +97,7 @@ const Checkout = () => {
           postal_code: form.postalCode,
           payment_method: 'cod',
           items,
-          total_price: total,
+          promo_code: quote?.promo ? quote.promo.code : undefined,
         }),
       });
       const data = await res.json();
@@ -133,7 +106,12 @@ const Checkout = () => {
       }
       clearCart();
       navigate('/order-complete', {
-        state: { orderId: data.order_id, items, form, total },
+        state: {
+          orderId: data.order_id,
+          items,
+          form,
+          total: data.total_price,
+        },
       });
     } catch (err) {
       setError(err.message);
@@ -304,11 +282,11 @@ const Checkout = () => {
               sx={{ display: 'flex', justifyContent: 'space-between' }}
             >
               <span>Total:</span>
-              <span>{total.toFixed(2)} BDT</span>
+              <span>{total === null ? '—' : `${total.toFixed(2)} BDT`}</span>
             </Typography>
-            {error && (
+            {(error || quoteError) && (
               <Typography color="error" sx={{ mt: 2 }}>
-                {error}
+                {error || quoteError}
               </Typography>
             )}
             <Button
@@ -317,7 +295,7 @@ const Checkout = () => {
               fullWidth
               sx={{ mt: 3 }}
               onClick={handleSubmit}
-              disabled={loading || items.length === 0}
+              disabled={loading || items.length === 0 || !quote}
             >
               Place Order
             </Button>
@@ -51,7 +51,8 @@ function Customize() {
 
   const thicknesses = getThicknesses(posterType);
   const sizes = getSizes(posterType, thickness);
-  const price = getPrice(posterType, thickness, size) * qty;
+  const unitPrice = getPrice(posterType, thickness, size);
+  const price = unitPrice * qty;
 
   const handleSubmit = async (e) => {
     e.preventDefault();
@@ -72,7 +73,14 @@ function Customize() {
       });
       if (!res.ok) throw new Error();
       const data = await res.json();
-      addItem({ posterType, size, thickness: thickValue, price, qty, orderCode: data.order_code });
+      addItem({
+        posterType,
+        size,
+        thickness: thickValue,
+        price: unitPrice,
+        qty,
+        orderCode: data.order_code,
+      });
       setImage(null);
       setPreview(null);
       setPosterType('');
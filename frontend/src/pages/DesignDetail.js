@@ -74,7 +74,8 @@ function DesignDetail() {
 
   const thicknesses = getThicknesses(posterType);
   const sizes = getSizes(posterType, thickness);
-  const price = getPrice(posterType, thickness, size) * qty;
+  const unitPrice = getPrice(posterType, thickness, size);
+  const price = unitPrice * qty;
 
   const handleAdd = (e) => {
     e.preventDefault();
@@ -89,7 +90,7 @@ function DesignDetail() {
       type: posterType,
       size,
       thickness: thicknesses.length > 0 ? thickness : '',
-      price,
+      price: unitPrice,
       quantity: qty,
     });
     fetch(`${API_BASE}/api/product-performance`, {
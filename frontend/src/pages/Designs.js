@@ -7,6 +7,7 @@ import API_BASE from '../utils/apiBase';
 function Designs() {
   const [designs, setDesigns] = useState([]);
   const [categories, setCategories] = useState([]);
+  const [mainCounts, setMainCounts] = useState({});
   const [selectedMain, setSelectedMain] = useState('');
   const [selectedSub, setSelectedSub] = useState('');
   const [categoriesLoaded, setCategoriesLoaded] = useState(false);
@@ -16,10 +17,17 @@ function Designs() {
   useEffect(() => {
     const loadCategories = async () => {
       try {
-        const res = await fetch(`${API_BASE}/api/categories`);
+        const res = await fetch(`${API_BASE}/api/categories/tree`);
         if (res.ok) {
-          const data = await res.json();
-          setCategories(data);
+          const tree = await res.json();
+          setCategories(
+            tree.flatMap((main) =>
+              main.categories.map((c) => ({ ...c, main_category: main.name })),
+            ),
+          );
+          setMainCounts(
+            Object.fromEntries(tree.map((main) => [main.name, main.design_count])),
+          );
         }
       } catch {
         // ignore category load errors
@@ -75,7 +83,7 @@ function Designs() {
           <option value="">All Categories</option>
           {MAIN_CATEGORIES.map((cat) => (
             <option key={cat} value={cat}>
-              {cat}
+              {cat} ({mainCounts[cat] || 0})
             </option>
           ))}
         </select>
@@ -89,7 +97,7 @@ function Designs() {
             .filter((c) => c.main_category === selectedMain)
             .map((c) => (
               <option key={c.id} value={c.id}>
-                {c.name}
+                {c.name} ({c.design_count})
               </option>
             ))}
         </select>
@@ -0,0 +1,53 @@
+import { useEffect, useState } from 'react';
+import API_BASE from './apiBase';
+
+// Wait this long after the last cart or city change before asking for a quote
+const QUOTE_DELAY_MS = 300;
+
+// Prices the cart on the server: poster discounts, promo code and delivery.
+export async function fetchQuote(items, { promoCode, city } = {}, signal) {
+  const res = await fetch(`${API_BASE}/api/quote`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ items, promo_code: promoCode || undefined, city }),
+    signal,
+  });
+  const data = await res.json();
+  if (!res.ok) {
+    throw new Error(data.error || 'Failed to price cart');
+  }
+  return data;
+}
+
+// Returns { quote, error } for the cart, re-quoting when its inputs change.
+export function useQuote(items, { promoCode, city } = {}) {
+  const [quote, setQuote] = useState(null);
+  const [error, setError] = useState('');
+
+  useEffect(() => {
+    if (items.length === 0) {
+      setQuote(null);
+      setError('');
+      return undefined;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(() => {
+      fetchQuote(items, { promoCode, city }, controller.signal)
+        .then((data) => {
+          setQuote(data);
+          setError('');
+        })
+        .catch((err) => {
+          if (err.name === 'AbortError') return;
+          setQuote(null);
+          setError(err.message);
+        });
+    }, QUOTE_DELAY_MS);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [items, promoCode, city]);
+
+  return { quote, error };
+}